@@ -0,0 +1,122 @@
+"""
+Unified command line for the whole pipeline.
+
+Every subcommand imports only the modules it needs, at the moment it runs, so
+short single-site checks do not pay for pandas, scikit-learn or Playwright.
+Examples:
+    python logo_cli.py site tesla.com
+    python logo_cli.py batch
+    python logo_cli.py group --sweep 1000 5000 250
+    python logo_cli.py group --workers 0
+    python logo_cli.py map
+    python logo_cli.py re-extract
+    python logo_cli.py pack            /  python logo_cli.py unpack some_folder
+    python logo_cli.py bench startup
+"""
+import sys
+import argparse
+import importlib
+
+# Module loaded by each subcommand (the only heavy import it performs)
+COMMAND_MODULES = {
+    "site": "src.extract_logo.pipeline",
+    "batch": "run_batch",
+    "group": "src.grouping_logic.groupe_by_similarity",
+    "map": "src.map_logos_for_urls.mapper",
+    "re-extract": "src.re_extract_null_logo.re_extract_failed",
+    "pack": "src.logo_pack.logo_pack",
+    "unpack": "src.logo_pack.logo_pack",
+    "bench": "run_benchmarks",
+}
+
+def load_command(name):
+    """ Imports the module behind a subcommand. """
+    return importlib.import_module(COMMAND_MODULES[name])
+
+def cmd_site(args):
+    return load_command("site").run_pipeline_single_site(args.url)
+
+def cmd_batch(args):
+    return load_command("batch").main()
+
+def cmd_group(args):
+    if args.workers is not None and args.rebuild:
+        args.group_parser.error("argument --workers: not allowed with argument --rebuild")
+    grouping = load_command("group")
+    if args.sweep:
+        start, stop, step = args.sweep
+        thresholds = []
+        while start < stop:
+            thresholds.append(start)
+            start += step
+        return grouping.run_threshold_sweep(thresholds, rebuild=args.rebuild)
+    if args.threshold is not None or args.rebuild:
+        threshold = args.threshold if args.threshold is not None else grouping.SIMILARITY_THRESHOLD
+        return grouping.run_threshold_cut(threshold, rebuild=args.rebuild)
+    workers = args.workers if args.workers is not None else 1
+    return grouping.run_group_analysis(workers=workers or grouping.GROUP_WORKERS)
+
+def cmd_map(args):
+    return load_command("map").create_final_map()
+
+def cmd_re_extract(args):
+    return load_command("re-extract").main()
+
+def cmd_pack(args):
+    from src.extract_logo.config import OUTPUT_FOLDER, OUTPUT_LOG_CSV, LOGO_PACK
+    return load_command("pack").pack_png_folder(args.folder or OUTPUT_FOLDER, LOGO_PACK, OUTPUT_LOG_CSV)
+
+def cmd_unpack(args):
+    from src.extract_logo.config import OUTPUT_FOLDER, LOGO_PACK
+    return load_command("unpack").unpack_to_png_folder(LOGO_PACK, args.folder or OUTPUT_FOLDER)
+
+def cmd_bench(args):
+    return load_command("bench").run(args.names)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="logo_cli", description="Logo extraction & similarity grouping pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("site", help="Extract the logo of a single site (fast HTTP path, then browser).")
+    p.add_argument("url")
+    p.set_defaults(func=cmd_site)
+
+    p = sub.add_parser("batch", help="Extract logos for every site in the input CSV.")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("group", help="Group logos by visual similarity.")
+    # --workers runs the full grouping; the tree options work on the saved single-linkage tree
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--threshold", type=float, help="Cut the saved single-linkage tree at this ε (builds the tree on first use).")
+    mode.add_argument("--sweep", nargs=3, type=float, metavar=("START", "STOP", "STEP"), help="Report group counts/sizes for every ε in [START, STOP).")
+    mode.add_argument("--workers", type=int, help="Sharded multi-process grouping on N processes (0 = all cores); not combinable with the tree options.")
+    p.add_argument("--rebuild", action="store_true", help="Force rebuilding the single-linkage tree.")
+    p.set_defaults(func=cmd_group, group_parser=p)
+
+    p = sub.add_parser("map", help="Map every input URL to its saved logo file.")
+    p.set_defaults(func=cmd_map)
+
+    p = sub.add_parser("re-extract", help="Retry extraction for URLs without a logo.")
+    p.set_defaults(func=cmd_re_extract)
+
+    p = sub.add_parser("pack", help="Pack a PNG logo folder into the container.")
+    p.add_argument("folder", nargs="?")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("unpack", help="Export the container back to a PNG folder.")
+    p.add_argument("folder", nargs="?")
+    p.set_defaults(func=cmd_unpack)
+
+    p = sub.add_parser("bench", help="Run benchmarks (all if no name is given).")
+    p.add_argument("names", nargs="*")
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = args.func(args)
+    return 1 if result is False else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
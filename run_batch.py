@@ -1,46 +1,55 @@
 import pandas as pd
-import concurrent.futures
-from tqdm import tqdm
-from src.extract_logo.utils import normalize_url, download_html, get_base, find_logo_in_header
-from src.extract_logo.processor import process_and_save
-from src.extract_logo.scraper import get_logo_with_playwright
-from src.extract_logo.config import FORCE_VISUAL_RENDER, MAX_WORKERS
+from functools import partial
+from src.extract_logo.pipeline import extract_site
+from src.extract_logo.scraper import get_logo_with_playwright_detailed
+from src.extract_logo.failures import update_failure_log, FAILURE_LOG_CSV
+from src.extract_logo.scheduler import HostAwareScheduler
+from src.extract_logo.browser_pool import BrowserPool
+from src.extract_logo.config import MAX_WORKERS, MAX_PER_HOST, USE_BROWSER_POOL, DEAD_COST_WITH_BROWSER
+from src.extract_logo.candidates import LEGACY_IMG
 
 INPUT_CSV = "./data/veridion.csv"
 
-def process_single_site(url):
-    url = normalize_url(url)
-    # print(f"Processing: {url}")
-    
-    success = False
-    base = url
-    
-    if not FORCE_VISUAL_RENDER:
-        html, final_url = download_html(url)
-        if html:
-            if final_url: base = get_base(final_url)
-            logo_src = find_logo_in_header(html, base)
-            if logo_src:
-                success = process_and_save(logo_src, base)
-
-    if not success:
-        try:
-            logo_src = get_logo_with_playwright(url)
-            if logo_src:
-                success = process_and_save(logo_src, url)
-        except: pass
-        
-    return "Done"
+def process_single_site(url, browser=get_logo_with_playwright_detailed):
+    """ Quiet single-site extraction for the batch. Returns the site_outcome dict. """
+    return extract_site(url, browser, verbose=False)
+
+def fast_path_report(results):
+    """ Share of sites that never needed the browser, vs what the legacy <img> rule alone would have solved. """
+    total = len(results)
+    if not total:
+        return
+    fast = [r for r in results if r.get("fast_source")]
+    legacy = sum(1 for r in fast if r["fast_source"] == LEGACY_IMG)
+    print(f"Fast path (no browser): {len(fast)}/{total} ({100 * len(fast) / total:.1f}%) | "
+          f"legacy <img> rule only: {legacy}/{total} ({100 * legacy / total:.1f}%)")
+    by_kind = pd.Series([r["fast_source"] for r in fast]).value_counts()
+    for kind, count in by_kind.items():
+        print(f"   {kind}: {count}")
 
 def main():
     try:
         df = pd.read_csv(INPUT_CSV)
         urls = df.iloc[:, 0].dropna().tolist()
         
-        print(f"🚀 Pornire Batch: {len(urls)} site-uri | {MAX_WORKERS} workers")
+        print(f"🚀 Pornire Batch: {len(urls)} site-uri | {MAX_WORKERS} workers | max {MAX_PER_HOST}/host")
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            list(tqdm(executor.map(process_single_site, urls), total=len(urls)))
+        # Dead-domain cost samples bypass the pool so they never show up in its stats
+        dead_cost_browser = get_logo_with_playwright_detailed if DEAD_COST_WITH_BROWSER else None
+
+        if USE_BROWSER_POOL:
+            # Browser fallbacks run in supervised processes with a hard per-site deadline
+            with BrowserPool() as pool:
+                results = HostAwareScheduler(partial(process_single_site, browser=pool.extract_detailed),
+                                             browser=dead_cost_browser).run(urls)
+        else:
+            results = HostAwareScheduler(process_single_site, browser=dead_cost_browser).run(urls)
+
+        fast_path_report(results)
+
+        # Structured failure reasons drive the next re-extraction pass
+        log = update_failure_log(results)
+        print(f"Failure reasons for {len(log)} sites saved to: {FAILURE_LOG_CSV}")
             
     except Exception as e:
         print(f"Eroare: {e}")
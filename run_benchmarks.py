@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import subprocess
+import numpy as np
+from io import BytesIO
+from PIL import Image, ImageOps
+
+CORPUS_DIR = "logo_dataset_pca"
+BENCH_SAMPLE = 200          # Number of corpus logos used per benchmark
+
+def _corpus_logos(limit=BENCH_SAMPLE):
+    """ Loads the first `limit` standardized logos from the corpus as 100x100 uint8 arrays. """
+    files = sorted(f for f in os.listdir(CORPUS_DIR) if f.lower().endswith(".png"))[:limit]
+    return [np.array(Image.open(os.path.join(CORPUS_DIR, f)).convert('L')) for f in files]
+
+def _legacy_normalize(img_bytes, target_size=(100, 100)):
+    """ Reference: the original multi-copy PIL chain used by process_image_with_pca. """
+    img = Image.open(BytesIO(img_bytes))
+    if img.width < 5 or img.height < 5 or img.getbbox() is None: return None
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        np_img = np.array(img)
+        mask = np_img[:, :, 3] > 0
+        if mask.sum() == 0: return None
+        avg_brightness = np.mean(np_img[mask][:, :3])
+    else:
+        img = img.convert('RGB')
+        avg_brightness = np.mean(np.array(img))
+    color = (255, 255, 255) if avg_brightness < 128 else (0, 0, 0)
+    background = Image.new('RGB', img.size, color)
+    if img.mode == 'RGBA': background.paste(img, mask=img.split()[3])
+    else: background.paste(img)
+    img_processed = background.convert('L')
+    if avg_brightness < 128: img_processed = ImageOps.invert(img_processed)
+    return np.array(ImageOps.pad(img_processed, target_size, color="black", centering=(0.5, 0.5)))
+
+def _raw_variants(logo):
+    """
+    Rebuilds 'as downloaded' inputs from a standardized logo: a hero-sized dark JPEG,
+    a transparent PNG and a favicon, covering the shapes the extractor really receives.
+    """
+    shape = Image.fromarray(logo)
+    dark = ImageOps.invert(shape)
+
+    buf = BytesIO()
+    dark.convert('RGB').resize((1600, 1600), Image.Resampling.BICUBIC).save(buf, format="JPEG", quality=90)
+    hero_jpeg = buf.getvalue()
+
+    rgba = Image.new('RGBA', (800, 800), (20, 20, 120, 0))
+    rgba.putalpha(shape.resize((800, 800), Image.Resampling.BICUBIC))
+    buf = BytesIO()
+    rgba.save(buf, format="PNG")
+    transparent_png = buf.getvalue()
+
+    buf = BytesIO()
+    dark.convert('RGB').resize((32, 32), Image.Resampling.LANCZOS).save(buf, format="PNG")
+    favicon = buf.getvalue()
+
+    return {"hero_jpeg": hero_jpeg, "transparent_png": transparent_png, "favicon": favicon}
+
+def bench_normalization():
+    """ Compares the vectorized normalize_logo against the legacy PIL chain (speed + pixel difference). """
+    from src.extract_logo.processor import normalize_logo
+
+    samples = [_raw_variants(logo) for logo in _corpus_logos()]
+    print(f"Normalization benchmark on {len(samples)} corpus logos")
+    print(f"{'Input':<16}{'Legacy (ms)':>12}{'New (ms)':>10}{'Speedup':>9}{'Mean |Δ|':>10}{'Max |Δ|':>9}")
+
+    for kind in samples[0]:
+        inputs = [s[kind] for s in samples]
+        start = time.perf_counter()
+        legacy = [_legacy_normalize(b) for b in inputs]
+        t_legacy = (time.perf_counter() - start) / len(inputs) * 1000
+        start = time.perf_counter()
+        new = [normalize_logo(b) for b in inputs]
+        t_new = (time.perf_counter() - start) / len(inputs) * 1000
+
+        diffs = [np.abs(a.astype(int) - b.astype(int)) for a, b in zip(legacy, new) if a is not None and b is not None]
+        mean_diff = np.mean([d.mean() for d in diffs])
+        max_diff = np.max([d.max() for d in diffs])
+        print(f"{kind:<16}{t_legacy:>12.2f}{t_new:>10.2f}{t_legacy / t_new:>8.1f}x{mean_diff:>10.2f}{max_diff:>9}")
+
+def _corpus_scores():
+    """ PCA score matrix T of the whole corpus, as produced by the grouping pipeline. """
+    from src.grouping_logic.groupe_by_similarity import load_and_vectorize_images, apply_pca_and_get_features
+    X, _, _ = load_and_vectorize_images()
+    return apply_pca_and_get_features(X)
+
+def bench_distance_kernel(thresholds=(1000, 2000, 2500, 3000, 4000)):
+    """
+    Compares the float32 Gram kernel against the float64 pairwise_distances path:
+    speed, and the exact set of sub-threshold edges for several ε.
+    """
+    from sklearn.metrics.pairwise import pairwise_distances
+    from src.grouping_logic.distance_kernel import threshold_edges
+
+    T = _corpus_scores()
+    print(f"Distance kernel benchmark on T {T.shape}")
+    print(f"{'ε':>6}{'float64 (ms)':>14}{'float32 (ms)':>14}{'Edges':>9}{'Mismatches':>12}")
+
+    T64 = T.astype(np.float64)
+    for threshold in thresholds:
+        start = time.perf_counter()
+        D = pairwise_distances(T64, metric='euclidean')
+        ref_rows, ref_cols = np.nonzero(np.triu(D < threshold, k=1))
+        t_ref = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        rows, cols = threshold_edges(T, threshold)
+        t_new = (time.perf_counter() - start) * 1000
+
+        ref = set(zip(ref_rows.tolist(), ref_cols.tolist()))
+        new = set(zip(rows.tolist(), cols.tolist()))
+        print(f"{threshold:>6}{t_ref:>14.1f}{t_new:>14.1f}{len(ref):>9}{len(ref ^ new):>12}")
+
+SCALING_ROWS = 40000        # Logos in the synthetic grouping corpus (real PCA scores, tiled with jitter)
+SCALING_SHARD_ROWS = 2048
+
+def _scaled_scores(rows=SCALING_ROWS, seed=0):
+    """ Enlarges the corpus score matrix by tiling it with small Gaussian jitter (keeps the real distance structure). """
+    T = _corpus_scores().astype(np.float32)
+    rng = np.random.default_rng(seed)
+    reps = -(-rows // T.shape[0])
+    tiled = np.tile(T, (reps, 1))[:rows]
+    return tiled + rng.normal(0, 0.01 * T.std(), tiled.shape).astype(np.float32)
+
+def bench_grouping_scaling(core_counts=None, threshold=None):
+    """
+    Sharded multi-process grouping on 1, 2, 4 ... cores: wall time, speedup over one
+    worker and whether the partition matches the single-process group_by_threshold.
+    Returns False on any mismatch.
+    """
+    from src.grouping_logic.groupe_by_similarity import group_by_threshold, build_group_results, SIMILARITY_THRESHOLD
+    from src.grouping_logic.sharded_grouping import sharded_threshold_labels
+
+    threshold = threshold or SIMILARITY_THRESHOLD
+    cpus = os.cpu_count() or 1
+    core_counts = core_counts or sorted({1, cpus} | {2 ** k for k in range(cpus.bit_length()) if 2 ** k <= cpus})
+    T = _scaled_scores()
+    metadata = [{"filename": f"{i}.png", "domain_key": str(i)} for i in range(T.shape[0])]
+
+    start = time.perf_counter()
+    reference = group_by_threshold(T, threshold, metadata)
+    t_ref = time.perf_counter() - start
+    print(f"Grouping scaling benchmark on T {T.shape}, ε = {threshold}, shards of {SCALING_SHARD_ROWS} rows")
+    print(f"Single-process group_by_threshold: {t_ref:.2f}s")
+    print(f"{'Workers':>8}{'Time (s)':>10}{'Speedup':>9}{'Groups':>8}  Match")
+
+    all_match = True
+    base = None
+    for workers in core_counts:
+        start = time.perf_counter()
+        labels = sharded_threshold_labels(T, threshold, workers, SCALING_SHARD_ROWS)
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        results = build_group_results(labels.tolist(), metadata)
+        match = results == reference
+        all_match = all_match and match
+        print(f"{workers:>8}{elapsed:>10.2f}{base / elapsed:>8.2f}x{len(set(labels.tolist())):>8}  {'OK' if match else 'MISMATCH'}")
+
+    return all_match
+
+# Import-time budget (seconds) for each CLI subcommand; `bench startup` fails when one is exceeded
+STARTUP_BUDGETS = {
+    "site": 0.6,
+    "batch": 0.9,
+    "group": 0.8,
+    "map": 0.8,
+    "re-extract": 0.9,
+    "pack": 0.4,
+    "unpack": 0.4,
+}
+STARTUP_RUNS = 3
+
+def bench_startup():
+    """
+    Measures, in a fresh interpreter, how long each logo_cli subcommand takes to
+    import everything it needs (best of STARTUP_RUNS). Returns False if any
+    subcommand exceeds its budget.
+    """
+    probe = ("import time; t = time.perf_counter(); import logo_cli; "
+             "logo_cli.load_command('{}'); print(time.perf_counter() - t)")
+    print(f"{'Command':<12}{'Import (s)':>11}{'Process (s)':>12}{'Budget (s)':>11}  Status")
+
+    within_budget = True
+    for command, budget in STARTUP_BUDGETS.items():
+        import_times, process_times = [], []
+        for _ in range(STARTUP_RUNS):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, "-c", probe.format(command)], capture_output=True, text=True)
+            process_times.append(time.perf_counter() - start)
+            if out.returncode != 0:
+                import_times.append(float("inf"))
+                print(f"   {command}: {out.stderr.strip().splitlines()[-1]}")
+            else:
+                import_times.append(float(out.stdout.strip().splitlines()[-1]))
+        best = min(import_times)
+        status = "OK" if best <= budget else "OVER BUDGET"
+        within_budget = within_budget and best <= budget
+        print(f"{command:<12}{best:>11.3f}{min(process_times):>12.3f}{budget:>11.2f}  {status}")
+
+    return within_budget
+
+BENCHMARKS = {
+    "normalization": bench_normalization,
+    "distance_kernel": bench_distance_kernel,
+    "grouping_scaling": bench_grouping_scaling,
+    "startup": bench_startup,
+}
+
+def run(names=None):
+    """ Runs the named benchmarks (all when empty). Returns False if any benchmark reports a failure. """
+    ok = True
+    for name in names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            ok = False
+            continue
+        ok = BENCHMARKS[name]() is not False and ok
+    return ok
+
+if __name__ == "__main__":
+    # Example: python run_benchmarks.py normalization
+    sys.exit(0 if run(sys.argv[1:]) else 1)
@@ -1,4 +1,6 @@
-from src.grouping_logic.groupe_by_similarity import run_group_analysis 
+import sys
+from logo_cli import main
 
 if __name__ == "__main__":
-    run_group_analysis()
\ No newline at end of file
+    # Same options as `python logo_cli.py group` (--threshold, --sweep, --rebuild)
+    sys.exit(main(["group", *sys.argv[1:]]))
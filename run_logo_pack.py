@@ -0,0 +1,8 @@
+import sys
+from logo_cli import main
+
+if __name__ == "__main__":
+    # Examples:
+    #   python run_logo_pack.py pack                 (logo_dataset_pca -> data/logo_pack.npy/.csv)
+    #   python run_logo_pack.py unpack some_folder   (data/logo_pack -> PNG files)
+    sys.exit(main(sys.argv[1:] or ["pack"]))
@@ -0,0 +1,203 @@
+import os
+import time
+import queue
+import signal
+import threading
+import multiprocessing
+from .failures import BROWSER_ERROR, BROWSER_TIMEOUT, BROWSER_CRASH
+from .config import MAX_WORKERS, BROWSER_SITE_BUDGET, BROWSER_MAX_RSS_MB, BROWSER_MAX_SITES, BROWSER_RSS_POLL
+
+def _worker_main(conn):
+    """
+    Worker process loop: receives (url, extended) tasks, answers with
+    (Base64 screenshot or None, failure_reason).
+    Runs in its own process group so the supervisor can kill it together with Chromium.
+    """
+    if hasattr(os, "setsid"):
+        os.setsid()
+    from .scraper import get_logo_with_playwright_detailed
+
+    while True:
+        try: task = conn.recv()
+        except (EOFError, KeyboardInterrupt): break
+        if task is None: break
+        url, extended = task
+        try: result = get_logo_with_playwright_detailed(url, extended=extended)
+        except Exception as e:
+            print(f" Browser worker error: {e}")
+            result = (None, BROWSER_ERROR)
+        conn.send(result)
+
+def _children(pid):
+    """ Direct child PIDs of a process (Linux /proc); empty where unavailable. """
+    kids = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                kids.extend(int(k) for k in f.read().split())
+    except OSError: pass
+    return kids
+
+def _descendants(pid):
+    """ A process and all its descendants (Linux /proc), parents first. """
+    found, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        if current in found: continue
+        found.append(current)
+        stack.extend(_children(current))
+    return found
+
+def _tree_rss_mb(pid):
+    """ Resident memory of a process and all its descendants in MB, or None if it cannot be read. """
+    total_kb = 0
+    for current in _descendants(pid):
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            if current == pid: return None
+    return total_kb / 1024
+
+class _Worker:
+    """ One supervised browser process and its pipe. """
+    def __init__(self, ctx, target=_worker_main):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=target, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.sites = 0
+
+    def kill(self):
+        """
+        Kills the worker and every process it started. Playwright launches Chromium
+        detached (its own process group), so the process group of every descendant
+        is killed, not only the worker's.
+        """
+        if hasattr(os, "killpg"):
+            tree = _descendants(self.process.pid)
+            groups = []
+            for pid in tree:
+                try: groups.append(os.getpgid(pid))
+                except OSError: pass
+            own_group = os.getpgrp()
+            for pgid in dict.fromkeys(groups):
+                if pgid == own_group: continue
+                try: os.killpg(pgid, signal.SIGKILL)
+                except OSError: pass
+            # Descendants that share the supervisor's group are killed one by one
+            for pid in tree:
+                try: os.kill(pid, signal.SIGKILL)
+                except OSError: pass
+        try: self.process.kill()
+        except Exception: pass
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=10)
+        except Exception: pass
+        if self.process.is_alive(): self.kill()
+        else: self.conn.close()
+
+class BrowserPool:
+    """
+    Supervisor for browser extraction. Every site runs in a worker process under a
+    hard wall-clock budget and a memory limit checked while the site runs; on
+    timeout, crash or excessive memory the worker is killed (with its Chromium
+    children) and a fresh one is spawned. Thread-safe:
+    extract() can be called from the batch's worker threads.
+    """
+    def __init__(self, n_workers=MAX_WORKERS, site_budget=BROWSER_SITE_BUDGET,
+                 max_rss_mb=BROWSER_MAX_RSS_MB, max_sites=BROWSER_MAX_SITES, worker_target=_worker_main):
+        self.ctx = multiprocessing.get_context("spawn")
+        self.worker_target = worker_target
+        self.site_budget = site_budget
+        self.max_rss_mb = max_rss_mb
+        self.max_sites = max_sites
+        self.idle = queue.Queue()
+        self.stats = {"sites": 0, "timeouts": 0, "crashes": 0, "memory_kills": 0, "recycled": 0, "kills": 0}
+        self.durations = []
+        self._lock = threading.Lock()
+        self._all = []
+        for _ in range(n_workers):
+            self._spawn()
+
+    def _spawn(self):
+        worker = _Worker(self.ctx, self.worker_target)
+        with self._lock: self._all.append(worker)
+        self.idle.put(worker)
+
+    def _replace(self, worker, reason):
+        worker.kill()
+        with self._lock:
+            self._all.remove(worker)
+            self.stats[reason] += 1
+            if reason != "recycled": self.stats["kills"] += 1
+        self._spawn()
+
+    def extract(self, url):
+        """ Same contract as get_logo_with_playwright(url), but bounded by the per-site budget. """
+        return self.extract_detailed(url)[0]
+
+    def extract_detailed(self, url, extended=False):
+        """ Same contract as get_logo_with_playwright_detailed: returns (logo_data, failure_reason). """
+        worker = self.idle.get()
+        start = time.time()
+        try:
+            worker.conn.send((url, extended))
+            # Waits in short slices so the memory of the live Chromium tree is checked while the site runs
+            while not worker.conn.poll(BROWSER_RSS_POLL):
+                if time.time() - start >= self.site_budget:
+                    print(f" [SUPERVISOR] {url} exceeded {self.site_budget}s, killing browser worker.")
+                    self._replace(worker, "timeouts")
+                    return None, BROWSER_TIMEOUT
+                rss = _tree_rss_mb(worker.process.pid)
+                if rss is not None and rss > self.max_rss_mb:
+                    print(f" [SUPERVISOR] Browser worker uses {rss:.0f} MB on {url}, killing it.")
+                    self._replace(worker, "memory_kills")
+                    return None, BROWSER_CRASH
+            result = worker.conn.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            print(f" [SUPERVISOR] Browser worker crashed on {url}, respawning.")
+            self._replace(worker, "crashes")
+            return None, BROWSER_CRASH
+        finally:
+            with self._lock:
+                self.stats["sites"] += 1
+                self.durations.append(time.time() - start)
+
+        worker.sites += 1
+        if worker.sites >= self.max_sites:
+            self._replace(worker, "recycled")
+        else:
+            self.idle.put(worker)
+        return result
+
+    def close(self):
+        with self._lock: workers = list(self._all)
+        for worker in workers: worker.stop()
+
+    def report(self):
+        """ Prints timeout/kill counts and browser latency percentiles. """
+        durations = sorted(self.durations)
+        pct = lambda q: durations[min(len(durations) - 1, int(q * len(durations)))] if durations else 0.0
+        print("\n" + "="*50)
+        print("BROWSER SUPERVISOR REPORT")
+        print(f"Browser sites: {self.stats['sites']} | Timeouts: {self.stats['timeouts']} | "
+              f"Crashes: {self.stats['crashes']} | Memory kills: {self.stats['memory_kills']}")
+        print(f"Total kills: {self.stats['kills']} | Recycled workers: {self.stats['recycled']}")
+        print(f"Latency p50: {pct(0.5):.1f}s | p95: {pct(0.95):.1f}s | max: {pct(1.0):.1f}s (budget {self.site_budget}s)")
+        print("="*50)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.report()
@@ -0,0 +1,197 @@
+import re
+import json
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlparse, quote
+
+# Candidate kinds, ranked (higher score is tried first; ties keep document order)
+LEGACY_IMG = "img"              # First <img> with 'logo' in src or 'brand' in its markup (historic rule)
+JSONLD_LOGO = "jsonld_logo"     # schema.org Organization.logo
+HOME_LINK_SVG = "home_svg"      # Inline <svg> inside a link to the home page
+SRCSET_IMG = "srcset_img"       # <img> whose srcset / lazy-load attribute points to a logo
+TOUCH_ICON = "touch_icon"       # <link rel="apple-touch-icon">
+HEADER_SVG = "header_svg"       # Inline <svg> inside <header> (may also be a menu icon)
+OG_IMAGE = "og_image"           # <meta property="og:image"> (often a social banner)
+ICON_LINK = "icon_link"         # <link rel="icon"> / "shortcut icon" / "mask-icon"
+
+CANDIDATE_SCORES = {
+    LEGACY_IMG: 100,
+    JSONLD_LOGO: 90,
+    HOME_LINK_SVG: 85,
+    SRCSET_IMG: 80,
+    TOUCH_ICON: 60,
+    HEADER_SVG: 50,
+    OG_IMAGE: 45,
+    ICON_LINK: 40,
+}
+
+MAX_INLINE_SVG_CHARS = 200_000
+MAX_SVGS_PER_KIND = 3           # Valid inline SVGs kept per kind (the first one is often a menu/search icon)
+LAZY_SRC_ATTRS = ("data-src", "data-lazy-src", "data-original")
+SVG_NS = 'xmlns="http://www.w3.org/2000/svg"'
+
+def best_srcset_entry(srcset):
+    """ Picks the largest entry of a srcset ('a.png 1x, b.png 2x' / 'a.png 100w, b.png 300w'). """
+    best, best_size = None, -1.0
+    for part in srcset.split(","):
+        pieces = part.strip().split()
+        if not pieces: continue
+        size = 1.0
+        if len(pieces) > 1:
+            try: size = float(pieces[1][:-1])
+            except ValueError: pass
+        if size > best_size:
+            best, best_size = pieces[0], size
+    return best
+
+def _jsonld_logos(data):
+    """ Yields every 'logo' URL found in a JSON-LD document (any nesting, @graph included). """
+    if isinstance(data, list):
+        for item in data: yield from _jsonld_logos(item)
+    elif isinstance(data, dict):
+        logo = data.get("logo")
+        if isinstance(logo, str): yield logo
+        elif isinstance(logo, dict):
+            url = logo.get("url") or logo.get("contentUrl")
+            if isinstance(url, str): yield url
+        elif isinstance(logo, list):
+            yield from _jsonld_logos([{"logo": item} for item in logo])
+        for key, value in data.items():
+            if key != "logo" and isinstance(value, (dict, list)):
+                yield from _jsonld_logos(value)
+
+class LogoTagScanner(HTMLParser):
+    """
+    Event-driven logo discovery. `logo_src` is the exact equivalent of
+    find_logo_in_header (first <img> with 'logo' in src or 'brand' in its markup),
+    so parsing can stop right there. Until then every other logo hint in the page
+    is collected too (see CANDIDATE_SCORES) and ranked by ranked_candidates().
+    """
+    def __init__(self, page_url=None):
+        super().__init__(convert_charrefs=True)
+        self.logo_src = None
+        self.page_host = (urlparse(page_url).hostname or "").replace("www.", "") if page_url else ""
+        self._found = []                # (score, order, kind, src)
+        self._header_depth = 0
+        self._link_stack = []           # one bool per open <a>: is it a home link?
+        self._svg_parts = None          # markup of the inline <svg> being captured
+        self._svg_stack = []
+        self._svg_kind = None
+        self._jsonld = None
+
+    def _add(self, kind, src):
+        if src and src.strip():
+            self._found.append((CANDIDATE_SCORES[kind], len(self._found), kind, src.strip()))
+
+    def _is_home_link(self, href):
+        if href is None: return False
+        href = href.strip()
+        if href in ("/", "./", "/index.html", "/index.php"): return True
+        parsed = urlparse(href)
+        return bool(parsed.hostname) and parsed.path in ("", "/") and \
+            parsed.hostname.replace("www.", "") == self.page_host
+
+    def handle_starttag(self, tag, attrs):
+        if self._svg_parts is not None:
+            raw = self.get_starttag_text()
+            self._svg_parts.append(raw)
+            self._svg_stack.append(re.match(r"<\s*([^\s/>]+)", raw).group(1))
+            # <img> inside <foreignObject>: the legacy rule still sees it
+            if tag == "img": self._handle_img(dict(attrs))
+            return
+
+        if tag == "img":
+            self._handle_img(dict(attrs))
+        elif tag == "header":
+            self._header_depth += 1
+        elif tag == "a":
+            self._link_stack.append(self._is_home_link(dict(attrs).get("href")))
+        elif tag == "svg" and (any(self._link_stack) or self._header_depth):
+            self._svg_kind = HOME_LINK_SVG if any(self._link_stack) else HEADER_SVG
+            self._svg_parts = [self.get_starttag_text()]
+            self._svg_stack = ["svg"]
+        elif tag == "link":
+            attrs = dict(attrs)
+            rel = (attrs.get("rel") or "").lower()
+            if "apple-touch-icon" in rel: self._add(TOUCH_ICON, attrs.get("href"))
+            elif "icon" in rel: self._add(ICON_LINK, attrs.get("href"))
+        elif tag == "meta":
+            attrs = dict(attrs)
+            if (attrs.get("property") or attrs.get("name") or "").lower() in ("og:image", "og:image:url", "og:logo"):
+                self._add(OG_IMAGE, attrs.get("content"))
+        elif tag == "script":
+            if (dict(attrs).get("type") or "").lower() == "application/ld+json":
+                self._jsonld = []
+
+    def _handle_img(self, attrs):
+        src = attrs.get("src")
+        # Same rule as find_logo_in_header ('brand' anywhere in the tag's markup)
+        markup = " ".join(f"{k}={v or ''}" for k, v in attrs.items()).lower()
+        if src and self.logo_src is None and ("logo" in src.lower() or "brand" in markup):
+            self.logo_src = src
+            self._add(LEGACY_IMG, src)
+            return
+        if "logo" not in markup: return
+        for attr in LAZY_SRC_ATTRS:
+            if attrs.get(attr):
+                self._add(SRCSET_IMG, attrs[attr])
+                return
+        srcset = attrs.get("srcset") or attrs.get("data-srcset")
+        if srcset:
+            self._add(SRCSET_IMG, best_srcset_entry(srcset))
+
+    def handle_startendtag(self, tag, attrs):
+        if self._svg_parts is not None:
+            self._svg_parts.append(self.get_starttag_text())
+            if tag == "img": self._handle_img(dict(attrs))
+            return
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._svg_parts is not None:
+            # HTMLParser lowercases end tags; close with the original (camelCase) SVG name
+            while self._svg_stack:
+                name = self._svg_stack.pop()
+                self._svg_parts.append(f"</{name}>")
+                if name.lower() == tag: break
+            if not self._svg_stack: self._finish_svg()
+            return
+
+        if tag == "header" and self._header_depth:
+            self._header_depth -= 1
+        elif tag == "a" and self._link_stack:
+            self._link_stack.pop()
+        elif tag == "script" and self._jsonld is not None:
+            try:
+                for logo in _jsonld_logos(json.loads("".join(self._jsonld))):
+                    self._add(JSONLD_LOGO, logo)
+            except ValueError: pass
+            self._jsonld = None
+
+    def handle_data(self, data):
+        if self._svg_parts is not None:
+            self._svg_parts.append(escape(data, quote=False))
+            if sum(len(p) for p in self._svg_parts) > MAX_INLINE_SVG_CHARS:
+                self._svg_parts, self._svg_stack = None, []
+        elif self._jsonld is not None:
+            self._jsonld.append(data)
+
+    def _finish_svg(self):
+        markup = "".join(self._svg_parts)
+        self._svg_parts = None
+        if not re.search(r"<(path|text|use|polygon|rect|circle|ellipse|g)\b", markup, re.IGNORECASE): return
+        # The first few valid svgs of each kind, in document order (later ones are usually social icons)
+        if sum(kind == self._svg_kind for _, _, kind, _ in self._found) >= MAX_SVGS_PER_KIND: return
+        if "xmlns=" not in markup[:markup.find(">")]:
+            markup = markup.replace("<svg", f"<svg {SVG_NS}", 1)
+        self._add(self._svg_kind, "data:image/svg+xml;utf8," + quote(markup))
+
+    def ranked_candidates(self):
+        """ [(kind, src), ...] best first, without duplicate sources. """
+        seen, ranked = set(), []
+        for _, _, kind, src in sorted(self._found, key=lambda c: (-c[0], c[1])):
+            if src in seen: continue
+            seen.add(src)
+            ranked.append((kind, src))
+        return ranked
@@ -10,6 +10,25 @@ TIMEOUT = 15            # General timeout for HTTP requests (in seconds)
 MAX_WORKERS = 4         # Maximum number of concurrent browser threads (workers)
                         # it can can be increased based on system capabilities
 
+# HOST-AWARE SCHEDULING (run_batch)
+DNS_WORKERS = 32        # Threads used to resolve all hostnames up front
+MAX_PER_HOST = 1        # Maximum concurrent sites served by the same IP address
+SLOW_SITE_SECONDS = TIMEOUT  # Sites slower than this push their host to the back of the queue
+DEAD_COST_SAMPLES = 3   # Dead domains re-run through the legacy path to measure the time their skip saves
+DEAD_COST_WITH_BROWSER = False  # Also time the legacy browser attempt (launches an in-process Chromium after the run)
+
+# SUPERVISED BROWSER WORKERS (Playwright fallback)
+USE_BROWSER_POOL = True      # Run browser extraction in supervised worker processes instead of in-thread
+BROWSER_SITE_BUDGET = 75     # Hard wall-clock budget per site (seconds); the worker is killed when exceeded
+BROWSER_MAX_RSS_MB = 2048    # Worker (+ Chromium children) memory limit; killed as soon as it is exceeded
+BROWSER_RSS_POLL = 0.5       # Seconds between memory checks while a site is running
+BROWSER_MAX_SITES = 200      # Recycle each worker after this many sites (bounds slow leaks on multi-day runs)
+
+STREAM_HTML_DISCOVERY = True  # If True, the fast method reads the homepage incrementally and stops at the first logo candidate.
+MAX_HTML_BYTES = 2 * 1024 * 1024  # Byte cap for streamed HTML (the logo is almost always in the first few KB).
+HTML_CHUNK_SIZE = 16 * 1024   # Size of each chunk read from the socket while streaming.
+FAST_CANDIDATES = 3           # Top ranked HTML logo candidates downloaded concurrently before falling back to the browser.
+
 FORCE_VISUAL_RENDER = False  # If True, skips the fast HTTP request and forces Playwright for quality extraction. 
                              # Set to False to prioritize speed.
 
@@ -19,4 +38,6 @@ TARGET_SIZE = (100, 100)     # Standardized pixel dimension for all final logos.
 
 INPUT_CSV = "data/veridion.csv"
 OUTPUT_FOLDER = "logo_dataset_pca"
-OUTPUT_LOG_CSV = "data/mapare_finala_verificata.csv"
\ No newline at end of file
+OUTPUT_LOG_CSV = "data/mapare_finala_verificata.csv"
+LOGO_PACK = "data/logo_pack"        # Packed container ('.npy' pixels + '.csv' index), see run_logo_pack.py
+READ_FROM_LOGO_PACK = True          # Mapper reads saved logos from LOGO_PACK when it exists
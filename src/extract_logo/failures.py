@@ -0,0 +1,121 @@
+import os
+import csv
+import time
+import socket
+import threading
+
+FAILURE_LOG_CSV = "data/extraction_failures.csv"
+FAILURE_FIELDS = ["URL", "Fast_Reason", "Browser_Reason", "Strategy_Tried", "Updated"]
+
+# getaddrinfo error codes that mean "this name does not exist" (not a temporary failure)
+NXDOMAIN_ERRORS = {getattr(socket, name) for name in ("EAI_NONAME", "EAI_NODATA") if hasattr(socket, name)}
+
+# FAST PATH (HTTP) failure reasons
+DNS_ERROR = "DNS_ERROR"                 # NXDOMAIN: name does not exist (no retry can succeed)
+CONNECTION_ERROR = "CONNECTION_ERROR"   # Refused / reset / TLS failure on both addresses
+HTTP_TIMEOUT = "HTTP_TIMEOUT"
+HTTP_STATUS = "HTTP_{}"                 # Non-200 answer, e.g. HTTP_403
+NO_CANDIDATE = "NO_CANDIDATE"           # HTML downloaded, no <img> matched the logo rules
+DOWNLOAD_ERROR = "DOWNLOAD_ERROR"       # Candidate found but the image could not be fetched/decoded
+PCA_REJECTED = "PCA_REJECTED"           # Image undecodable, empty, too small or a solid color
+SAVE_ERROR = "SAVE_ERROR"               # Processing worked but writing the file failed
+
+# BROWSER (Playwright) failure reasons
+BROWSER_NO_CANDIDATE = "BROWSER_NO_CANDIDATE"
+BROWSER_ERROR = "BROWSER_ERROR"         # Navigation / page error
+BROWSER_TIMEOUT = "BROWSER_TIMEOUT"     # Killed by the supervisor (per-site budget)
+BROWSER_CRASH = "BROWSER_CRASH"
+
+# RE-EXTRACTION strategies
+STRATEGY_FULL = "FULL"                          # HTTP fast path, then browser
+STRATEGY_BROWSER = "BROWSER"                    # Straight to the browser (HTTP path already failed)
+STRATEGY_BROWSER_EXTENDED = "BROWSER_EXTENDED"  # Browser with the extended selector set
+STRATEGY_SKIP = "SKIP"                          # Nothing can succeed (dead domain, or every strategy already failed)
+
+def _gaierror_in(e):
+    """ Finds the socket.gaierror wrapped by requests / urllib3 (cause chain, .reason, args). """
+    seen, stack = set(), [e]
+    while stack:
+        err = stack.pop()
+        if err is None or id(err) in seen: continue
+        seen.add(id(err))
+        if isinstance(err, socket.gaierror): return err
+        if isinstance(err, BaseException):
+            stack.extend([err.__cause__, err.__context__, getattr(err, "reason", None)])
+            stack.extend(a for a in err.args if isinstance(a, BaseException))
+    return None
+
+def classify_request_error(e):
+    """
+    Maps a requests exception to a failure reason (DNS vs timeout vs other connection errors).
+    Only NXDOMAIN counts as DNS_ERROR; a temporary resolver failure is a CONNECTION_ERROR
+    so the browser and later re-extractions still get their chance.
+    """
+    text = f"{e.__class__.__name__} {e}"
+    if "Timeout" in text or "timed out" in text: return HTTP_TIMEOUT
+    gai = _gaierror_in(e)
+    if gai is not None:
+        return DNS_ERROR if gai.errno in NXDOMAIN_ERRORS else CONNECTION_ERROR
+    if "Name or service not known" in text or "nodename nor servname" in text:
+        return DNS_ERROR
+    return CONNECTION_ERROR
+
+def next_strategy(fast_reason, browser_reason, strategy_tried=None):
+    """
+    Chooses the re-extraction strategy from the recorded reasons, skipping
+    attempts that cannot succeed. Strategies only escalate, they never repeat:
+    FULL -> BROWSER -> BROWSER_EXTENDED -> SKIP. A browser capture that yielded
+    nothing usable (no candidate, rejected or unreadable image) goes straight
+    to the extended selector set. A SAVE_ERROR is a local write failure (the site
+    gave a valid logo), so the same strategy is simply run again.
+    """
+    if fast_reason == DNS_ERROR: return STRATEGY_SKIP
+    if SAVE_ERROR in (fast_reason, browser_reason): return strategy_tried or STRATEGY_FULL
+    if strategy_tried == STRATEGY_BROWSER_EXTENDED: return STRATEGY_SKIP
+    if strategy_tried == STRATEGY_BROWSER: return STRATEGY_BROWSER_EXTENDED
+    if browser_reason in (BROWSER_NO_CANDIDATE, PCA_REJECTED, DOWNLOAD_ERROR): return STRATEGY_BROWSER_EXTENDED
+    if fast_reason or browser_reason: return STRATEGY_BROWSER
+    return STRATEGY_FULL
+
+def site_outcome(url, success, fast_reason=None, browser_reason=None, strategy=STRATEGY_FULL, fast_source=None):
+    """
+    Per-site result record produced by the extraction pipeline.
+    fast_source is the candidate kind that succeeded on the HTTP path (None if the browser was needed).
+    """
+    return {"url": url, "success": success, "fast_reason": fast_reason,
+            "browser_reason": browser_reason, "strategy": strategy, "fast_source": fast_source}
+
+_log_lock = threading.Lock()
+
+def read_failure_log(path=FAILURE_LOG_CSV):
+    """ URL -> failure row of the last run that touched it. """
+    if not os.path.exists(path): return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row["URL"]: row for row in csv.DictReader(f)}
+
+def update_failure_log(outcomes, path=FAILURE_LOG_CSV):
+    """
+    Merges a run's outcomes into the failure log: failed URLs are (re)written with
+    their reasons (stages skipped this run keep the old one), URLs that succeeded are removed.
+    """
+    with _log_lock:
+        log = read_failure_log(path)
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        for outcome in outcomes:
+            if outcome["success"]:
+                log.pop(outcome["url"], None)
+            else:
+                # A stage that was not attempted this run keeps its previous reason
+                previous = log.get(outcome["url"], {})
+                log[outcome["url"]] = {
+                    "URL": outcome["url"],
+                    "Fast_Reason": outcome.get("fast_reason") or previous.get("Fast_Reason", ""),
+                    "Browser_Reason": outcome.get("browser_reason") or previous.get("Browser_Reason", ""),
+                    "Strategy_Tried": outcome.get("strategy") or STRATEGY_FULL,
+                    "Updated": now,
+                }
+        with open(path, "w", newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FAILURE_FIELDS, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writeheader()
+            writer.writerows(log.values())
+    return log
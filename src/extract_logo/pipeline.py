@@ -0,0 +1,74 @@
+from .config import FORCE_VISUAL_RENDER
+from .utils import normalize_url, get_base, find_logo_candidates_fast
+from .scraper import get_logo_with_playwright_detailed
+from .processor import process_and_save_detailed, process_and_save_candidates
+from .failures import (site_outcome, BROWSER_ERROR, STRATEGY_FULL,
+                       STRATEGY_BROWSER_EXTENDED, STRATEGY_SKIP, DNS_ERROR)
+
+def extract_site(url, browser=get_logo_with_playwright_detailed, strategy=STRATEGY_FULL, verbose=True):
+    """
+    Main logic:
+    1. Try Requests (Fast)
+    2. If it fails, activate Playwright (Robust)
+    3. Send result to Processing (PCA + Save)
+    `browser(url, extended)` returns (logo_data, failure_reason) (BrowserPool.extract_detailed
+    for supervised workers). `strategy` lets the re-extraction pass skip attempts that
+    already failed. Returns a site_outcome dict with the failure reason of each stage.
+    """
+    log = print if verbose else (lambda *a, **k: None)
+    url = normalize_url(url)
+    log(f"\n--- ! Start Analysis: {url} ! --- (strategy: {strategy})")
+
+    if strategy == STRATEGY_SKIP:
+        return site_outcome(url, False, fast_reason=DNS_ERROR, strategy=strategy)
+    
+    success = False
+    base = url
+    logo_src = None
+    fast_reason = browser_reason = fast_source = None
+
+    # FAST METHOD (HTTP REQUESTS)
+    if not FORCE_VISUAL_RENDER and strategy == STRATEGY_FULL:
+        log("1 Trying fast method (Requests)...")
+        candidates, final_url, fast_reason = find_logo_candidates_fast(url)
+        
+        if final_url: 
+            base = get_base(final_url)
+        
+        if candidates:
+            # Top ranked candidates are downloaded concurrently, the best valid one is kept
+            fast_reason, fast_source = process_and_save_candidates(candidates, base)
+            if fast_reason is None:
+                log(f" [FAST] Logo extracted and processed successfully! (source: {fast_source})")
+                success = True
+
+    # DNS failures cannot be fixed by a browser
+    if not success and fast_reason == DNS_ERROR:
+        log(" [FAILURE] Domain does not resolve, skipping browser.")
+        return site_outcome(url, False, fast_reason=fast_reason, strategy=strategy)
+
+    # BRUTE METHOD => higher time and resource consumption (PLAYWRIGHT)
+    if not success:
+        log(" [FALLBACK] Activating Special Mode (Playwright)...")
+        try:
+            # Playwright returns Base64 PNG directly
+            logo_src, browser_reason = browser(url, extended=strategy == STRATEGY_BROWSER_EXTENDED)
+            
+            if logo_src:
+                browser_reason = process_and_save_detailed(logo_src, url)
+                if browser_reason is None:
+                    log("SOLVED => [BROWSER] Logo extracted via screenshot!")
+                    success = True
+        except Exception as e:
+            log(f"!!!!! Error in Playwright mode: {e}")
+            browser_reason = BROWSER_ERROR
+
+    # FINALIZATION
+    if not success:
+        log(" [FAILURE] Could not extract a valid logo for this site.")
+    
+    return site_outcome(url, success, fast_reason, browser_reason, strategy, fast_source)
+
+def run_pipeline_single_site(url, browser=get_logo_with_playwright_detailed):
+    """ Runs the full pipeline for one site. Returns True on success, False otherwise. """
+    return extract_site(url, browser)["success"]
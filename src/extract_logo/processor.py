@@ -1,13 +1,89 @@
-from PIL import Image, ImageOps
+from PIL import Image
 from io import BytesIO
 import numpy as np
-from sklearn.decomposition import PCA
 from urllib.parse import urlparse
 import os
-import cairosvg
 import base64
-from .config import PCA_COMPONENTS, TARGET_SIZE, OUTPUT_FOLDER 
+import concurrent.futures
+from .config import PCA_COMPONENTS, TARGET_SIZE, OUTPUT_FOLDER, FAST_CANDIDATES
 from .utils import safe_folder, download_image_bytes
+from .failures import DOWNLOAD_ERROR, PCA_REJECTED, SAVE_ERROR, NO_CANDIDATE
+from src.logo_pack.logo_pack import bump_folder_generation
+
+def _fit_size(size, target):
+    """ Size of an image scaled to fit inside target while keeping its aspect ratio (as ImageOps.contain). """
+    w, h = size
+    im_ratio, dest_ratio = w / h, target[0] / target[1]
+    if im_ratio > dest_ratio:
+        return target[0], max(1, round(h / w * target[0]))
+    return max(1, round(w / h * target[1])), target[1]
+
+def normalize_logo(img_bytes):
+    """
+    Single-pass normalization engine. Decodes at reduced resolution (JPEG draft,
+    integer reduce) so large logos are shrunk before any pixel work, then does alpha
+    compositing, luminance and polarity inversion as vectorized uint8 array
+    operations. Returns a TARGET_SIZE uint8 "Signal-on-Zero" matrix, or None.
+    """
+    img = Image.open(BytesIO(img_bytes))
+    if img.width < 5 or img.height < 5: return None
+
+    # Keep at least 2x the final resolution so the last resize still antialiases properly
+    fitted = _fit_size(img.size, TARGET_SIZE)
+    work_size = (fitted[0] * 2, fitted[1] * 2)
+    img.draft('RGB', work_size)  # JPEG only: DCT-domain downscale while decoding
+
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+    # Premultiplied alpha ('RGBa') keeps the box-filter reduce free of fringes around transparent edges
+    img = img.convert('RGBA').convert('RGBa') if has_alpha else img.convert('RGB')
+
+    factor = min(img.width // work_size[0], img.height // work_size[1])
+    if factor > 1: img = img.reduce(factor)
+
+    arr = np.asarray(img)
+    rgb = arr[:, :, :3]
+    if has_alpha:
+        alpha = arr[:, :, 3]
+        mask = alpha > 0
+        if not mask.any(): return None
+        # Brightness is measured on the un-premultiplied colours of visible pixels
+        avg_brightness = np.mean(rgb[mask] * (255.0 / alpha[mask])[:, None])
+        alpha = alpha.astype(np.uint32)
+    else:
+        if not rgb.any(): return None
+        avg_brightness = np.mean(rgb)
+        alpha = np.uint32(255)
+
+    # ITU-R 601-2 luma with the same fixed-point weights as PIL's convert('L')
+    rgb = rgb.astype(np.uint32)
+    luma = (rgb[:, :, 0] * 19595 + rgb[:, :, 1] * 38470 + rgb[:, :, 2] * 7471 + 0x8000) >> 16
+
+    if avg_brightness < 128: # Dark Logo (e.g., Toyota Black): on white, then inverted
+        # invert(L*a + 255*(1-a)) == (255-L)*a, i.e. alpha minus the premultiplied luma
+        signal = np.clip(alpha - luma, 0, 255) if has_alpha else 255 - luma
+    else: # Light Logo (e.g., Mazda White): on black
+        signal = luma
+    signal = signal.astype(np.uint8)
+
+    # Uniform padding: fit, then center on a black TARGET_SIZE canvas
+    small = np.asarray(Image.fromarray(signal).resize(fitted, Image.Resampling.BICUBIC))
+    canvas = np.zeros((TARGET_SIZE[1], TARGET_SIZE[0]), dtype=np.uint8)
+    x = round((TARGET_SIZE[0] - fitted[0]) * 0.5)
+    y = round((TARGET_SIZE[1] - fitted[1]) * 0.5)
+    canvas[y:y + fitted[1], x:x + fitted[0]] = small
+    return canvas
+
+def pca_reconstruct(matrix, n_comp):
+    """
+    PCA fit + inverse_transform on a single image matrix (rows = samples), identical to
+    sklearn's full-SVD PCA but without importing scikit-learn on the extraction path.
+    """
+    matrix = matrix.astype(np.float64)
+    mean = matrix.mean(axis=0)
+    centered = matrix - mean
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    basis = vt[:n_comp]
+    return (centered @ basis.T) @ basis + mean
 
 def process_image_with_pca(img_bytes):
     """
@@ -15,42 +91,10 @@ def process_image_with_pca(img_bytes):
     standardizes geometry (padding), applies PCA compression, and reconstructs the image.
     """
     try:
-        img = Image.open(BytesIO(img_bytes))
-        
-        if img.width < 5 or img.height < 5 or img.getbbox() is None: return None
+        img_matrix = normalize_logo(img_bytes)
+        if img_matrix is None: return None
 
-        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-            img = img.convert('RGBA')
-            np_img = np.array(img)
-            alpha = np_img[:, :, 3]
-            mask = alpha > 0
-            
-            if mask.sum() > 0:
-                rgb = np_img[mask][:, :3]
-                avg_brightness = np.mean(rgb)
-            else:
-                return None
-        else:
-            img = img.convert('RGB')
-            avg_brightness = np.mean(np.array(img))
-
-        if avg_brightness < 128: # Dark Logo (e.g., Toyota Black)
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'RGBA': background.paste(img, mask=img.split()[3])
-            else: background.paste(img)
-            img_processed = ImageOps.invert(background.convert('L'))
-        else: # Light Logo (e.g., Mazda White)
-            # Paste onto BLACK background (already results in White on Black).
-            background = Image.new('RGB', img.size, (0, 0, 0))
-            if img.mode == 'RGBA': background.paste(img, mask=img.split()[3])
-            else: background.paste(img)
-            img_processed = background.convert('L')
-
-        img_padded = ImageOps.pad(img_processed, TARGET_SIZE, color="black", centering=(0.5, 0.5))
-        
         # PCA Application
-        img_matrix = np.array(img_padded)
-        
         # Check for zero variance (solid color image)
         if np.std(img_matrix) < 1: return None
 
@@ -58,9 +102,7 @@ def process_image_with_pca(img_bytes):
         n_comp = min(PCA_COMPONENTS, min(img_matrix.shape))
         
         print(f" Applying PCA ({n_comp} components)...")
-        pca = PCA(n_components=n_comp)
-        img_transformed = pca.fit_transform(img_matrix)
-        img_reconstructed = pca.inverse_transform(img_transformed)
+        img_reconstructed = pca_reconstruct(img_matrix, n_comp)
         
         img_final_array = np.clip(img_reconstructed, 0, 255).astype('uint8')
         final = Image.fromarray(img_final_array)
@@ -79,7 +121,36 @@ def process_and_save(logo_src, base_url):
     Orchestrates extraction, PCA, and final saving to disk.
     Returns True on successful save, False otherwise.
     """
-    safe_folder(OUTPUT_FOLDER)
+    return process_and_save_detailed(logo_src, base_url) is None
+
+def process_and_save_detailed(logo_src, base_url):
+    """
+    Same as process_and_save, but returns None on success or the failure
+    reason (DOWNLOAD_ERROR, PCA_REJECTED, SAVE_ERROR) otherwise.
+    """
+    return save_logo_bytes(fetch_logo_bytes(logo_src, base_url), logo_src, base_url)
+
+def process_and_save_candidates(candidates, base_url, max_candidates=FAST_CANDIDATES):
+    """
+    Downloads the top ranked (kind, src) candidates concurrently, then processes them
+    best first and keeps the first one that passes. Returns (failure_reason, kind):
+    (None, kind) on success, (reason of the best candidate, None) otherwise.
+    """
+    top = candidates[:max_candidates]
+    if not top: return NO_CANDIDATE, None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(top)) as executor:
+        fetched = list(executor.map(lambda c: fetch_logo_bytes(c[1], base_url), top))
+
+    first_reason = None
+    for (kind, src), img_bytes in zip(top, fetched):
+        reason = save_logo_bytes(img_bytes, src, base_url)
+        if reason is None: return None, kind
+        first_reason = first_reason or reason
+    return first_reason, None
+
+def fetch_logo_bytes(logo_src, base_url):
+    """ Returns the raw image bytes of a logo source (URL, base64 or inline SVG data URI), or None. """
     img_bytes = None
     
     if logo_src.startswith("data:"):
@@ -94,15 +165,26 @@ def process_and_save(logo_src, base_url):
     else:
         img_bytes = download_image_bytes(logo_src, base_url)
 
-    if not img_bytes: return False
+    return img_bytes
+
+def save_logo_bytes(img_bytes, logo_src, base_url):
+    """
+    SVG rasterization, PCA & standardization, and final saving of already fetched bytes.
+    Returns None on success or the failure reason (DOWNLOAD_ERROR, PCA_REJECTED, SAVE_ERROR).
+    """
+    safe_folder(OUTPUT_FOLDER)
+    if not img_bytes: return DOWNLOAD_ERROR
 
     # CONVERT SVG to PNG
     if logo_src.lower().endswith(".svg") or (b"<svg" in img_bytes[:300]):
-        try: img_bytes = cairosvg.svg2png(bytestring=img_bytes, scale=10)
+        try:
+            import cairosvg  # Lazy: only SVG logos need the Cairo stack
+            img_bytes = cairosvg.svg2png(bytestring=img_bytes, scale=10)
         except: pass
 
     # PCA & STANDARDIZATION
     final_bytes = process_image_with_pca(img_bytes)
+    if not final_bytes: return PCA_REJECTED
     
     if final_bytes:
         try:
@@ -113,10 +195,11 @@ def process_and_save(logo_src, base_url):
             
             filename = f"{OUTPUT_FOLDER}/{domain}.png"
             with open(filename, "wb") as f: f.write(final_bytes)
+            bump_folder_generation(OUTPUT_FOLDER)  # Marks a packed copy of the folder as stale
             print(f"✅ Saved: {filename}")
-            return True
+            return None
         except Exception as e:
             # print(f"Error during final save/naming: {e}")
             pass
         
-    return False
\ No newline at end of file
+    return SAVE_ERROR
\ No newline at end of file
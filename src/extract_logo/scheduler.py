@@ -0,0 +1,216 @@
+import heapq
+import socket
+import time
+import threading
+import concurrent.futures
+from collections import deque, defaultdict
+from urllib.parse import urlparse
+from tqdm import tqdm
+from .config import MAX_WORKERS, DNS_WORKERS, MAX_PER_HOST, SLOW_SITE_SECONDS, DEAD_COST_SAMPLES
+from .utils import normalize_url, download_html
+from .failures import site_outcome, DNS_ERROR, NXDOMAIN_ERRORS
+
+class DNSCache:
+    """
+    Thread-safe hostname cache used to plan a run (dead domains, per-IP slots).
+    It is not plugged into requests, which still resolves each host itself.
+    resolve() returns a tuple of IPs, () for a dead domain (NXDOMAIN),
+    or None when the lookup failed for another (possibly temporary) reason.
+    """
+    def __init__(self):
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host):
+        with self._lock:
+            if host in self._cache: return self._cache[host]
+        try:
+            infos = socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+            result = tuple(sorted({info[4][0] for info in infos}))
+        except socket.gaierror as e:
+            result = () if e.errno in NXDOMAIN_ERRORS else None
+        except Exception:
+            result = None
+        with self._lock:
+            self._cache[host] = result
+        return result
+
+    def resolve_many(self, hosts, workers=DNS_WORKERS):
+        """ Resolves all hostnames concurrently (bulk warm-up of the cache). """
+        hosts = list(set(hosts))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(hosts, executor.map(self.resolve, hosts)))
+
+def www_variant(host):
+    """ 'tesla.com' -> 'www.tesla.com' (mirrors the fallback used by download_html). """
+    return host if host.startswith("www.") else "www." + host
+
+class _HostQueues:
+    """
+    Pending URLs grouped by host key. pop() hands out the earliest queued URL whose
+    host has a free slot (hosts not marked slow first) in O(log hosts), instead of
+    rescanning every pending URL on each dispatch.
+    """
+    def __init__(self, items, max_per_host):
+        self.max_per_host = max_per_host
+        self.queues = defaultdict(deque)
+        self.active = defaultdict(int)
+        self.slow = set()
+        self.ready, self.ready_slow = [], []   # Heaps of (index of the host's next URL, key)
+        self.in_ready = set()
+        self.remaining = len(items)
+        for idx, item in enumerate(items):
+            self.queues[item[1]].append((idx, item))
+        for key in self.queues:
+            self._offer(key)
+
+    def __len__(self):
+        return self.remaining
+
+    def _offer(self, key):
+        """ Makes a host ready if it has queued URLs and a free slot. """
+        if key in self.in_ready or not self.queues[key] or self.active[key] >= self.max_per_host: return
+        heapq.heappush(self.ready_slow if key in self.slow else self.ready, (self.queues[key][0][0], key))
+        self.in_ready.add(key)
+
+    def pop(self):
+        """ Next item to dispatch, or None when every host with queued URLs is busy. """
+        while self.ready:
+            idx, key = heapq.heappop(self.ready)
+            if key in self.slow:
+                # Became slow while waiting: behind every fast host from now on
+                heapq.heappush(self.ready_slow, (idx, key))
+                continue
+            return self._take(key)
+        if self.ready_slow:
+            return self._take(heapq.heappop(self.ready_slow)[1])
+        return None
+
+    def _take(self, key):
+        self.in_ready.discard(key)
+        _, item = self.queues[key].popleft()
+        self.active[key] += 1
+        self.remaining -= 1
+        self._offer(key)
+        return item
+
+    def release(self, key, slow=False):
+        """ A URL of this host finished; slow hosts are pushed to the back of the queue. """
+        self.active[key] -= 1
+        if slow: self.slow.add(key)
+        self._offer(key)
+
+class HostAwareScheduler:
+    """
+    Runs worker_fn(url) -> bool over a list of URLs with host awareness:
+    1. Resolves every hostname (and its www. variant) up front.
+    2. Fails dead domains (NXDOMAIN on both names) immediately, without HTTP or browser.
+    3. Caps concurrency per IP address (shared hosting, CDNs, dealer networks).
+    4. Pushes hosts that turned out slow or timed out to the back of the queue.
+    """
+    def __init__(self, worker_fn, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST, dns_cache=None, browser=None):
+        self.worker_fn = worker_fn
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.dns = dns_cache or DNSCache()
+        # Only used to measure what a dead domain costs on the legacy path; pass the plain
+        # scraper, never the batch's BrowserPool (the samples would skew its stats)
+        self.browser = browser
+
+    def _plan(self, urls):
+        """ Splits URLs into (dead, runnable) where runnable items are (url_to_fetch, host_key, input_url). """
+        urls = [normalize_url(str(u)) for u in urls]
+        hosts = {u: (urlparse(u).hostname or "") for u in urls}
+
+        print(f" Resolving DNS for {len(set(hosts.values()))} hosts...")
+        self.dns.resolve_many([h for h in hosts.values() if h] + [www_variant(h) for h in hosts.values() if h])
+
+        dead, runnable = [], []
+        for url in urls:
+            input_url = url
+            host = hosts[url]
+            ips = self.dns.resolve(host) if host else ()
+            if not ips and host and not host.startswith("www."):
+                www_ips = self.dns.resolve(www_variant(host))
+                if www_ips:
+                    # Only the www. name is alive: go there directly instead of failing first
+                    url = url.replace("://" + host, "://" + www_variant(host), 1)
+                    ips = www_ips
+            if ips == ():
+                dead.append(input_url)
+            else:
+                runnable.append((url, ips[0] if ips else host, input_url))
+        return dead, runnable
+
+    def _timed(self, url):
+        """ Runs the worker; accepts a plain bool or a site_outcome dict as its result. """
+        start = time.time()
+        try: outcome = self.worker_fn(url)
+        except Exception: outcome = False
+        if not isinstance(outcome, dict): outcome = site_outcome(url, bool(outcome))
+        return outcome, time.time() - start
+
+    def run(self, urls):
+        """
+        Processes all URLs. Returns one site_outcome dict per input URL, extended
+        with "status" and "seconds" ("url" is the normalized input URL).
+        """
+        run_start = time.time()
+        dead, runnable = self._plan(urls)
+        results = [{**site_outcome(u, False, fast_reason=DNS_ERROR), "status": "FAILED_DNS", "seconds": 0.0} for u in dead]
+
+        pending = _HostQueues(runnable, self.max_per_host)
+        running = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+             tqdm(total=len(dead) + len(runnable)) as progress:
+            progress.update(len(dead))
+            while pending or running:
+                while len(running) < self.max_workers:
+                    item = pending.pop()
+                    if item is None: break
+                    running[executor.submit(self._timed, item[0])] = item
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    _, key, input_url = running.pop(future)
+                    outcome, seconds = future.result()
+                    pending.release(key, slow=seconds > SLOW_SITE_SECONDS)
+                    status = "SUCCESS" if outcome["success"] else "FAILED"
+                    results.append({**outcome, "url": input_url, "status": status, "seconds": seconds})
+                    progress.update(1)
+
+        self._report(results, dead, len(pending.slow), time.time() - run_start)
+        return results
+
+    def _dead_domain_cost(self, dead, samples=DEAD_COST_SAMPLES):
+        """
+        Mean seconds a dead domain costs on the legacy path (HTTP, the www. retry,
+        then the browser attempt when a browser is given), measured on a few of
+        this run's dead domains.
+        """
+        timings = []
+        for url in dead[:samples]:
+            start = time.time()
+            download_html(url)
+            if self.browser is not None:
+                try: self.browser(url)
+                except Exception: pass
+            timings.append(time.time() - start)
+        return sum(timings) / len(timings) if timings else 0.0
+
+    def _report(self, results, dead, slow_count, wall_time):
+        """ Prints run statistics, including the measured wall time saved on dead domains. """
+        dead_count = len(dead)
+        cost_per_dead = self._dead_domain_cost(dead) if dead else 0.0
+        saved = dead_count * cost_per_dead / self.max_workers
+        measured = f"{min(dead_count, DEAD_COST_SAMPLES)}, {'HTTP + browser' if self.browser else 'HTTP only'}"
+
+        print("\n" + "="*50)
+        print("HOST-AWARE BATCH COMPLETE!")
+        print(f"Total sites: {len(results)} | Success: {sum(r['status'] == 'SUCCESS' for r in results)}")
+        print(f"Dead domains skipped (NXDOMAIN): {dead_count}")
+        print(f"Slow hosts deferred: {slow_count}")
+        print(f"Wall time: {wall_time:.1f}s | Time saved on dead domains: {saved:.1f}s "
+              f"({dead_count} x {cost_per_dead:.2f}s measured on {measured} / {self.max_workers} workers)")
+        print("="*50)
@@ -1,8 +1,8 @@
-from playwright.sync_api import sync_playwright
 from urllib.parse import urlparse
 import base64
 import time
 import re
+from .failures import BROWSER_NO_CANDIDATE, BROWSER_ERROR
 
 def extract_brand_name(url):
     """
@@ -14,15 +14,37 @@ def extract_brand_name(url):
         return domain.split('.')[0].split('-')[0]
     except: return None
 
+# Extra selectors tried by the re-extraction pass when the standard set found nothing
+EXTENDED_SELECTORS = [
+    "[class*='logo' i] img",
+    "[class*='logo' i] svg",
+    "[id*='logo' i] img",
+    "[id*='logo' i] svg",
+    "a[class*='brand' i]",
+    "[class*='header' i] a img",
+    "nav a img",
+    "header img",
+]
+
 def get_logo_with_playwright(url):
     """
     Launches a visible (non-headless) Chromium instance for robust logo extraction,
     applies dynamic selectors, scores candidates, and returns a Base64 screenshot.
     """
+    return get_logo_with_playwright_detailed(url)[0]
+
+def get_logo_with_playwright_detailed(url, extended=False):
+    """
+    Same as get_logo_with_playwright, but returns (logo_data, failure_reason)
+    and optionally also scans EXTENDED_SELECTORS.
+    """
+    from playwright.sync_api import sync_playwright  # Lazy: only browser fallbacks pay for the Playwright import
+
     brand_name = extract_brand_name(url)
     print(f"🚀 [SPECIAL MODE] Analyzing: {url} (Brand: {brand_name})")
 
     logo_data = None
+    reason = None
 
     with sync_playwright() as p:
         # Launch visible browser (headless=False) to bypass aggressive anti-bot detection (Tesla, etc.)
@@ -85,6 +107,9 @@ def get_logo_with_playwright(url):
                 ".elementor-widget-image img"
             ])
 
+            if extended:
+                container_selectors.extend(EXTENDED_SELECTORS)
+
             candidates = []
 
             # Scan and Score
@@ -161,11 +186,12 @@ def get_logo_with_playwright(url):
 
             else:
                 print(" No suitable candidates found.")
+                reason = BROWSER_NO_CANDIDATE
                 
         except Exception as e:
             print(f" Browser error: {e}")
-            pass
+            reason = BROWSER_ERROR
         finally:
             browser.close()
             
-    return logo_data
\ No newline at end of file
+    return logo_data, reason
\ No newline at end of file
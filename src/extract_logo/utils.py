@@ -1,10 +1,12 @@
 import os
+import codecs
 import requests
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 import base64
 import urllib3
-from .config import HEADERS, TIMEOUT 
+from .candidates import LogoTagScanner, LEGACY_IMG
+from .failures import DNS_ERROR, CONNECTION_ERROR, HTTP_STATUS, NO_CANDIDATE, classify_request_error
+from .config import HEADERS, TIMEOUT, STREAM_HTML_DISCOVERY, MAX_HTML_BYTES, HTML_CHUNK_SIZE
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -24,22 +26,24 @@ def get_base(url):
         return urlparse(url).scheme + "://" + urlparse(url).netloc
     except: return url
 
-def download_html(url):
+def _request_html(url, stream=False):
     """
-    Attempts to download HTML content. Includes a fallback attempt by
+    Performs the homepage GET request. Includes a fallback attempt by
     adding 'www.' if the initial connection fails.
+    Returns (Response, None) on HTTP 200, (None, failure_reason) otherwise.
     """
     # 1. Initial Attempt
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT, verify=False)
+        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT, verify=False, stream=stream)
         if r.status_code == 200: 
-            return r.text, r.url
+            return r, None
         
         # If server responds with 403/404, we print status and fail this attempt.
         print(f"[HTTP] Response Code: {r.status_code}")
-        return None, None
+        r.close()
+        return None, HTTP_STATUS.format(r.status_code)
         
-    except requests.exceptions.ConnectionError:
+    except requests.exceptions.ConnectionError as first_error:
         # 2. Connection Error -> Try with 'www.' fallback
         print(f"[HTTP] Direct connection error. Trying with www...")
         
@@ -50,23 +54,37 @@ def download_html(url):
             # Construct the new URL: https://www.domain.com/path
             www_url = parsed.scheme + "://www." + netloc_no_www + parsed.path
             
-            r = requests.get(www_url, headers=HEADERS, timeout=TIMEOUT, verify=False)
+            r = requests.get(www_url, headers=HEADERS, timeout=TIMEOUT, verify=False, stream=stream)
             if r.status_code == 200:
                 print("[HTTP] Success with www.")
-                return r.text, r.url
+                return r, None
             
             print(f"[HTTP] WWW Response Code: {r.status_code}")
-            return None, None
+            r.close()
+            return None, HTTP_STATUS.format(r.status_code)
 
         except Exception as e:
             print(f"[HTML Error] Total failure at both addresses: {e}")
-            return None, None
+            # Dead only if neither name resolves
+            reason = classify_request_error(e)
+            if reason == DNS_ERROR and classify_request_error(first_error) != DNS_ERROR:
+                reason = classify_request_error(first_error)
+            return None, reason
             
     except requests.exceptions.RequestException as e:
         print(f"[HTML Error] General Requests error: {e}")
-        return None, None
-    except: return None, None
+        return None, classify_request_error(e)
+    except Exception as e: return None, CONNECTION_ERROR
 
+def download_html(url):
+    """
+    Downloads the full HTML content. Returns (html, final_url) or (None, None).
+    """
+    r, _ = _request_html(url)
+    if r is None: return None, None
+    try:
+        return r.text, r.url
+    except: return None, None
 
 def download_image_bytes(src, base_url):
     """Downloads image bytes from a URL, handling relative paths."""
@@ -93,6 +111,8 @@ def find_logo_in_header(html, base_url):
     Searches HTML content for likely logo images based on common keywords 
     in src and element attributes.
     """
+    from bs4 import BeautifulSoup  # Lazy: the default streaming path never builds a soup
+
     try:
         soup = BeautifulSoup(html, "html.parser")
         for img in soup.find_all("img"):
@@ -104,6 +124,63 @@ def find_logo_in_header(html, base_url):
     except: pass
     return None
 
+def stream_logo_candidates(url):
+    """
+    Streaming variant of download_html + find_logo_in_header.
+    Reads the body in chunks (capped at MAX_HTML_BYTES) and stops as soon as
+    the historic logo candidate is found; until then every other logo hint
+    (JSON-LD, inline SVG, srcset, icons, og:image) is collected as well.
+    Returns (ranked [(kind, src)], final_url, failure_reason).
+    """
+    r, reason = _request_html(url, stream=True)
+    if r is None: return [], None, reason
+
+    scanner = LogoTagScanner(r.url)
+    try: decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+    except LookupError: decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    bytes_read = 0
+    try:
+        for chunk in r.iter_content(chunk_size=HTML_CHUNK_SIZE):
+            bytes_read += len(chunk)
+            scanner.feed(decoder.decode(chunk))
+            if scanner.logo_src or bytes_read >= MAX_HTML_BYTES: break
+        else:
+            scanner.feed(decoder.decode(b"", final=True))
+            scanner.close()
+    except Exception as e:
+        print(f"[HTML Error] Streaming interrupted after {bytes_read} bytes: {e}")
+    finally:
+        r.close()
+
+    candidates = scanner.ranked_candidates()
+    return candidates, r.url, None if candidates else NO_CANDIDATE
+
+def find_logo_candidates_fast(url):
+    """
+    Fast (HTTP-only) logo discovery. Uses the streaming scanner when
+    STREAM_HTML_DISCOVERY is enabled, otherwise the full download + BeautifulSoup
+    (the extra candidate kinds are still collected from the full HTML).
+    Returns (ranked [(kind, src)], final_url, failure_reason); failure_reason is None on success.
+    """
+    if STREAM_HTML_DISCOVERY:
+        return stream_logo_candidates(url)
+
+    r, reason = _request_html(url)
+    if r is None: return [], None, reason
+    try: html, final_url = r.text, r.url
+    except Exception: return [], None, CONNECTION_ERROR
+
+    scanner = LogoTagScanner(final_url)
+    try:
+        scanner.feed(html)
+        scanner.close()
+    except Exception: pass
+    candidates = [c for c in scanner.ranked_candidates() if c[0] != LEGACY_IMG]
+    logo_src = find_logo_in_header(html, get_base(final_url) if final_url else url)
+    if logo_src: candidates.insert(0, (LEGACY_IMG, logo_src))
+    return candidates, final_url, None if candidates else NO_CANDIDATE
+
 def get_domain_key_from_url(url):
     """ 
     Extracts the safe domain key for mapping/naming files (e.g., https://www.tesla.com/ -> tesla).
@@ -0,0 +1,69 @@
+import numpy as np
+
+BLOCK_ROWS = 1024           # Rows of the score matrix compared per BLAS call (bounds memory to BLOCK_ROWS x N)
+GRAM_REL_TOL = 1e-4         # float32 error band (relative to |a|²+|b|²) re-checked exactly in float64
+
+def squared_norms(T):
+    """ Row-wise squared norms |T_i|², computed once and reused by every block. """
+    return np.einsum('ij,ij->i', T, T)
+
+def block_threshold_edges(A, B, norms_a, norms_b, threshold, row_offset=0, col_offset=0, upper_only=True):
+    """
+    Finds all pairs (i, j) between the row blocks A and B with Dist < threshold.
+
+    Uses the Gram identity |a-b|² = |a|² + |b|² - 2 a·b, so the work is one float32
+    matrix product and the comparison is done on squared distances against ε².
+    Pairs whose float32 value falls inside the rounding band around ε² are
+    re-checked exactly in float64, so the decisions match the float64 Euclidean test.
+    Returns global (rows, cols) index arrays.
+    """
+    eps2 = np.float32(threshold) ** 2
+    d2 = norms_a[:, None] + norms_b[None, :] - 2 * (A @ B.T)
+    margin = GRAM_REL_TOL * (norms_a[:, None] + norms_b[None, :])
+
+    if upper_only:
+        # Keep only j > i (global indices) so each edge is reported once
+        rows_idx = np.arange(row_offset, row_offset + A.shape[0])[:, None]
+        cols_idx = np.arange(col_offset, col_offset + B.shape[0])[None, :]
+        d2[cols_idx <= rows_idx] = np.inf
+
+    sure = d2 < eps2 - margin
+    unsure = ~sure & (d2 < eps2 + margin)
+
+    rows, cols = np.nonzero(sure)
+    if unsure.any():
+        u_rows, u_cols = np.nonzero(unsure)
+        exact = np.sum((A[u_rows].astype(np.float64) - B[u_cols].astype(np.float64)) ** 2, axis=1)
+        keep = exact < np.float64(threshold) ** 2
+        rows = np.concatenate([rows, u_rows[keep]])
+        cols = np.concatenate([cols, u_cols[keep]])
+
+    return rows + row_offset, cols + col_offset
+
+def threshold_edges(T, threshold, block_rows=BLOCK_ROWS):
+    """ All edges (i < j) of the threshold graph, computed block by block in float32. """
+    T = np.ascontiguousarray(T, dtype=np.float32)
+    norms = squared_norms(T)
+    all_rows, all_cols = [], []
+    for start in range(0, T.shape[0], block_rows):
+        stop = min(start + block_rows, T.shape[0])
+        rows, cols = block_threshold_edges(
+            T[start:stop], T[start:], norms[start:stop], norms[start:], threshold,
+            row_offset=start, col_offset=start,
+        )
+        all_rows.append(rows)
+        all_cols.append(cols)
+    if not all_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(all_rows), np.concatenate(all_cols)
+
+def sample_distance_stats(T, n_pairs=20000, seed=0):
+    """ Estimates (max, mean) pairwise distance from a random sample of pairs instead of the full N x N matrix. """
+    N = T.shape[0]
+    if N < 2: return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    i = rng.integers(0, N, n_pairs)
+    j = rng.integers(0, N, n_pairs)
+    keep = i != j
+    dist = np.sqrt(np.sum((T[i[keep]].astype(np.float64) - T[j[keep]]) ** 2, axis=1))
+    return float(dist.max()), float(dist.mean())
@@ -2,18 +2,25 @@ import os
 import numpy as np
 import pandas as pd
 from PIL import Image
-from sklearn.decomposition import PCA
-from sklearn.metrics.pairwise import pairwise_distances
 from collections import defaultdict
 import csv
 import warnings
 import time
+import hashlib
+from .distance_kernel import threshold_edges, sample_distance_stats
+from .sharded_grouping import sharded_threshold_labels, GROUP_WORKERS
+from src.logo_pack.logo_pack import LogoPack, pack_exists, pack_is_current
+from src.extract_logo.config import LOGO_PACK
 
 warnings.filterwarnings('ignore', category=UserWarning) 
 
 INPUT_DIR = "logo_dataset_pca"
+INPUT_PACK = LOGO_PACK              # Packed container (see run_logo_pack.py), read instead of INPUT_DIR while it is current
+USE_LOGO_PACK = True
 OUTPUT_CSV = "mapare_categorii_finale.csv"
 SKIP_REPORT_CSV = "skip_report_detaliat.csv"
+HIERARCHY_FILE = "single_linkage_tree.npz"
+SWEEP_REPORT_CSV = "threshold_sweep_report.csv"
 PCA_COMPONENTS = 50                 
 SIMILARITY_THRESHOLD = 2500
 IMAGE_SIZE = (100, 100)             
@@ -65,9 +72,53 @@ def load_and_vectorize_images():
     print(f"   Total skipped files: {len(skipped_logs)}")
     return X, metadata, skipped_logs
 
+def load_images_from_pack():
+    """
+    Loads the data matrix X straight from the packed container (no per-file
+    open/decode). Metadata keeps the '<domain>.png' filenames of the folder layout.
+    """
+    print(f"Loading logos from pack '{INPUT_PACK}'...")
+    pack = LogoPack(INPUT_PACK)
+    X = pack.matrix()
+    metadata = [{"filename": f"{domain}.png", "domain_key": domain.split('.')[0].split('_')[0]} for domain in pack.keys()]
+    print(f"   X Matrix created: {X.shape} (N={X.shape[0]} samples, n={X.shape[1]} features)")
+    return X, metadata, []
+
+def _use_pack():
+    """ The pack is read only while it still mirrors INPUT_DIR (new extractions write PNGs only). """
+    return USE_LOGO_PACK and pack_is_current(INPUT_PACK, INPUT_DIR)
+
+def load_logos():
+    """ Returns (X, metadata, skipped_logs) from the pack when enabled and current, else from the PNG folder; None if neither exists. """
+    if _use_pack():
+        return load_images_from_pack()
+    if USE_LOGO_PACK and pack_exists(INPUT_PACK):
+        print(f"   Pack '{INPUT_PACK}' is older than '{INPUT_DIR}', reading the PNG folder (re-run `pack` to refresh it).")
+    if not os.path.exists(INPUT_DIR):
+        print(f"Error: Could not find image folder '{INPUT_DIR}'. Stopping.")
+        return None
+    return load_and_vectorize_images()
+
+def _content_signature():
+    """
+    Digest of the logos the next load_logos() call would return, names and content
+    (cheap: no image decoding). Uses the pack's SHA1 column, or each PNG's size and mtime.
+    """
+    if _use_pack():
+        with open(INPUT_PACK + ".csv", newline='', encoding='utf-8') as f:
+            entries = sorted(f"{entry['Domain']}.png:{entry['SHA1']}" for entry in csv.DictReader(f))
+    else:
+        entries = sorted(f"{e.name}:{e.stat().st_size}:{e.stat().st_mtime_ns}" for e in os.scandir(INPUT_DIR)
+                         if e.name.lower().endswith(".png") and not e.name.startswith('.'))
+    return hashlib.sha1("\n".join(entries).encode('utf-8')).hexdigest()
+
 def apply_pca_and_get_features(X):
     """ Applies PCA to reduce the 10000 features down to k principal components (scores). """
+    from sklearn.decomposition import PCA  # Lazy: cutting a saved single-linkage tree never needs scikit-learn
+
     n_features = X.shape[1]
+    # float32 halves memory traffic for centering, PCA and every distance computation after it
+    X = X.astype(np.float32)
     X_mean = X - np.mean(X, axis=0)
     
     n_comp = min(PCA_COMPONENTS, n_features)
@@ -86,17 +137,12 @@ def group_by_threshold(T, threshold, metadata):
     """
     print("   Calculating distances and forming graph...")
     
-    print("   Calculating distances and forming graph...")
-    
-    distance_matrix = pairwise_distances(T, metric='euclidean')
-    
-    # CODE FOR SCALING DEBUGGING
-    max_distance = np.max(distance_matrix)
-    avg_distance = np.mean(distance_matrix)
+    # CODE FOR SCALING DEBUGGING (sampled estimate, the full N x N matrix is never built)
+    max_distance, avg_distance = sample_distance_stats(T)
     
-    print(f" DEBUG DISTANCES:")
-    print(f"   Max Distance (between most dissimilar): {max_distance:.2f}")
-    print(f"   Average Distance: {avg_distance:.2f}")
+    print(f" DEBUG DISTANCES (sampled):")
+    print(f"   Max Distance (between most dissimilar): ~{max_distance:.2f}")
+    print(f"   Average Distance: ~{avg_distance:.2f}")
     print(f"   Current Threshold (ε): {threshold:.2f}")
     
     # threshold should be somewhere between 5% and 15% of the Max Distance
@@ -105,28 +151,35 @@ def group_by_threshold(T, threshold, metadata):
     N = T.shape[0]
     parent = list(range(N))
     
-    def find_root(i):
-        if parent[i] == i: return i
-        parent[i] = find_root(parent[i])
-        return parent[i]
-        
-    def union_sets(i, j):
-        root_i = find_root(i)
-        root_j = find_root(j)
+    rows, cols = threshold_edges(T, threshold)
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        root_i, root_j = _find_root(parent, i), _find_root(parent, j)
         if root_i != root_j:
             parent[root_i] = root_j
-            return True
-        return False
-        
-    for i in range(N):
-        for j in range(i + 1, N):
-            if distance_matrix[i, j] < threshold:
-                union_sets(i, j)
                 
+    return build_group_results([_find_root(parent, i) for i in range(N)], metadata)
+
+def group_by_threshold_sharded(T, threshold, metadata, workers=GROUP_WORKERS):
+    """
+    Multi-process, out-of-core variant of group_by_threshold: worker processes scan
+    (shard_i, shard_j) blocks of the memory-mapped score matrix and the edges are
+    merged with an array-based union-find. Produces the same Group_ID report.
+    """
+    print(f"   Sharded grouping on {workers} worker(s) (ε = {threshold:.2f})...")
+    start = time.time()
+    labels = sharded_threshold_labels(T, threshold, workers)
+    print(f"   Sharded grouping done in {time.time() - start:.2f}s.")
+    return build_group_results(labels.tolist(), metadata)
+
+def build_group_results(labels, metadata):
+    """
+    Converts per-logo component labels into report rows. Group_IDs are numbered
+    in order of each group's first member, so any labelling of the same
+    components yields the same report.
+    """
     groups = defaultdict(list)
-    for i in range(N):
-        root = find_root(i)
-        groups[root].append(metadata[i])
+    for i, label in enumerate(labels):
+        groups[label].append(metadata[i])
         
     final_results = []
     group_counter = 0
@@ -141,14 +194,130 @@ def group_by_threshold(T, threshold, metadata):
         
     return final_results
 
-def run_group_analysis():
-    """ Orchestrates the data loading, PCA, grouping, and final report generation. """
-    
-    if not os.path.exists(INPUT_DIR):
-        print(f"Error: Could not find image folder '{INPUT_DIR}'. Stopping.")
-        return False
+def build_single_linkage_tree(T):
+    """
+    Builds the Minimum Spanning Tree of the complete Euclidean graph over the
+    score vectors (Prim's algorithm, O(N) memory). The MST is the single-linkage
+    dendrogram: the connected components for ANY threshold ε are exactly the
+    components formed by the MST edges with weight < ε.
+    Returns (u, v, w) edge arrays sorted by ascending weight.
+    """
+    N = T.shape[0]
+    if N < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    # Exact float64 distances, the same decision rule group_by_threshold applies near ε
+    T = np.asarray(T, dtype=np.float64)
+
+    in_tree = np.zeros(N, dtype=bool)
+    best_dist = np.full(N, np.inf)
+    best_parent = np.zeros(N, dtype=np.int64)
+    u, v, w = [], [], []
+
+    current = 0
+    for _ in range(N - 1):
+        in_tree[current] = True
+        dist = np.sqrt(np.sum((T - T[current]) ** 2, axis=1))
+        closer = (dist < best_dist) & ~in_tree
+        best_dist[closer] = dist[closer]
+        best_parent[closer] = current
+
+        candidates = np.where(in_tree, np.inf, best_dist)
+        current = int(np.argmin(candidates))
+        u.append(best_parent[current])
+        v.append(current)
+        w.append(best_dist[current])
+
+    u, v, w = np.array(u, dtype=np.int64), np.array(v, dtype=np.int64), np.array(w)
+    order = np.argsort(w, kind='stable')
+    return u[order], v[order], w[order]
+
+def _find_root(parent, i):
+    """ Iterative find with path halving (the MST of a large dataset can form long chains). """
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
 
-    X_data, metadata, skipped_logs = load_and_vectorize_images()
+def cut_single_linkage_tree(u, v, w, N, threshold):
+    """
+    Cuts the single-linkage dendrogram at ε: unions only the MST edges with
+    weight < threshold, in O(N). Returns one component label per logo.
+    """
+    parent = list(range(N))
+    for a, b in zip(u[w < threshold].tolist(), v[w < threshold].tolist()):
+        root_a, root_b = _find_root(parent, a), _find_root(parent, b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+    return [_find_root(parent, i) for i in range(N)]
+
+def save_hierarchy(u, v, w, metadata, signature):
+    """ Persists the MST together with the logo metadata and content signature it was built from. """
+    np.savez(
+        HIERARCHY_FILE,
+        u=u, v=v, w=w,
+        filenames=np.array([m['filename'] for m in metadata]),
+        domain_keys=np.array([m['domain_key'] for m in metadata]),
+        pca_components=PCA_COMPONENTS,
+        distance_dtype="float64",
+        content_signature=signature,
+    )
+    print(f"   Single-linkage tree saved to: {HIERARCHY_FILE}")
+
+def load_hierarchy():
+    """
+    Loads the persisted MST. Returns (u, v, w, metadata), or None when the file
+    is missing or stale (a logo was added, removed or overwritten, PCA_COMPONENTS
+    changed since it was built, or it predates the float64 MST distances).
+    """
+    if not os.path.exists(HIERARCHY_FILE): return None
+    try:
+        data = np.load(HIERARCHY_FILE)
+        filenames = data['filenames'].tolist()
+        if 'content_signature' not in data or str(data['content_signature']) != _content_signature() \
+                or int(data['pca_components']) != PCA_COMPONENTS \
+                or 'distance_dtype' not in data or str(data['distance_dtype']) != "float64":
+            print("   Saved single-linkage tree is stale, rebuilding...")
+            return None
+        metadata = [{"filename": f, "domain_key": k} for f, k in zip(filenames, data['domain_keys'].tolist())]
+        return data['u'], data['v'], data['w'], metadata
+    except Exception as e:
+        print(f"   Could not load single-linkage tree ({e}), rebuilding...")
+        return None
+
+def get_hierarchy(rebuild=False):
+    """ Returns the persisted single-linkage tree, building it (load -> PCA -> MST) if needed. """
+    hierarchy = None if rebuild else load_hierarchy()
+    if hierarchy is not None:
+        return hierarchy
+
+    # Taken before loading: a logo overwritten while the tree is built leaves it stale
+    try: signature = _content_signature()
+    except OSError: signature = ""
+    loaded = load_logos()
+    if loaded is None: return None
+    X_data, metadata, skipped_logs = loaded
+    if X_data.size == 0:
+        print("Fatal Error: Could not load valid images. Stopping.")
+        return None
+
+    T_features = apply_pca_and_get_features(X_data)
+    print("   Building single-linkage tree (MST)...")
+    start = time.time()
+    u, v, w = build_single_linkage_tree(T_features)
+    print(f"   MST built in {time.time() - start:.2f}s ({len(w)} edges).")
+    save_hierarchy(u, v, w, metadata, signature)
+    return u, v, w, metadata
+
+def run_group_analysis(workers=1):
+    """
+    Orchestrates the data loading, PCA, grouping, and final report generation.
+    With workers > 1 the threshold graph is built by the sharded multi-process grouping.
+    """
+    
+    loaded = load_logos()
+    if loaded is None: return False
+    X_data, metadata, skipped_logs = loaded
     
     if skipped_logs:
         try:
@@ -164,7 +333,10 @@ def run_group_analysis():
     print(f"\nTotal valid logos loaded: {X_data.shape[0]}")
     
     T_features = apply_pca_and_get_features(X_data)
-    final_groups = group_by_threshold(T_features, SIMILARITY_THRESHOLD, metadata)
+    if workers > 1:
+        final_groups = group_by_threshold_sharded(T_features, SIMILARITY_THRESHOLD, metadata, workers)
+    else:
+        final_groups = group_by_threshold(T_features, SIMILARITY_THRESHOLD, metadata)
     
     df_results = pd.DataFrame(final_groups)
     
@@ -182,5 +354,68 @@ def run_group_analysis():
     
     return True
 
+def run_threshold_cut(threshold=SIMILARITY_THRESHOLD, rebuild=False):
+    """ Groups the logos at any ε by cutting the persisted single-linkage tree (no PCA re-run). """
+    hierarchy = get_hierarchy(rebuild)
+    if hierarchy is None: return False
+    u, v, w, metadata = hierarchy
+
+    labels = cut_single_linkage_tree(u, v, w, len(metadata), threshold)
+    df_results = pd.DataFrame(build_group_results(labels, metadata))
+    df_results.to_csv(OUTPUT_CSV, index=False, quoting=csv.QUOTE_NONNUMERIC)
+
+    print("\n" + "="*50)
+    print(f"SINGLE-LINKAGE CUT COMPLETE (ε = {threshold})")
+    print(f"Total logos processed (final): {df_results.shape[0]}")
+    print(f"Total groups found: {df_results['Group_ID'].nunique()}")
+    print(f"Report saved to: {OUTPUT_CSV}")
+    print("="*50)
+    return True
+
+def run_threshold_sweep(thresholds, rebuild=False):
+    """
+    Reports group counts and sizes for a whole range of thresholds in one run.
+    Thresholds are processed in ascending order and MST edges are merged
+    incrementally, so the full sweep costs a single pass over the tree.
+    """
+    hierarchy = get_hierarchy(rebuild)
+    if hierarchy is None: return False
+    u, v, w, metadata = hierarchy
+    N = len(metadata)
+
+    parent = list(range(N))
+    size = [1] * N
+    n_groups, largest, singletons = N, 1 if N else 0, N
+    edge_idx = 0
+    rows = []
+
+    for threshold in sorted(thresholds):
+        while edge_idx < len(w) and w[edge_idx] < threshold:
+            root_a, root_b = _find_root(parent, int(u[edge_idx])), _find_root(parent, int(v[edge_idx]))
+            if root_a != root_b:
+                singletons -= (size[root_a] == 1) + (size[root_b] == 1)
+                parent[root_a] = root_b
+                size[root_b] += size[root_a]
+                largest = max(largest, size[root_b])
+                n_groups -= 1
+            edge_idx += 1
+        rows.append({
+            "Threshold": threshold,
+            "Groups": n_groups,
+            "Largest_Group": largest,
+            "Singletons": singletons,
+            "Grouped_Logos": N - singletons,
+        })
+
+    df_sweep = pd.DataFrame(rows)
+    df_sweep.to_csv(SWEEP_REPORT_CSV, index=False, quoting=csv.QUOTE_NONNUMERIC)
+
+    print("\n" + "="*50)
+    print("THRESHOLD SWEEP COMPLETE!")
+    print(df_sweep.to_string(index=False))
+    print(f"Report saved to: {SWEEP_REPORT_CSV}")
+    print("="*50)
+    return True
+
 if __name__ == '__main__':
     run_group_analysis()
\ No newline at end of file
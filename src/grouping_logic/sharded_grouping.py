@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+from .distance_kernel import block_threshold_edges, squared_norms
+
+SHARD_ROWS = 4096               # Rows per shard: a worker holds at most two shards and one SHARD_ROWS² block
+GROUP_WORKERS = os.cpu_count() or 1
+UNION_BATCH_EDGES = 2_000_000   # Edges buffered before each union-find merge (bounds the parent's memory)
+
+# Per-worker state, opened once by _init_worker
+_scores = None
+_norms = None
+
+def _init_worker(scores_file):
+    global _scores, _norms
+    _scores = np.load(scores_file, mmap_mode='r')
+    _norms = np.load(_norms_file(scores_file), mmap_mode='r')
+
+def _close_worker():
+    """ Drops the in-process memory maps (serial mode) so the temporary files can be removed. """
+    global _scores, _norms
+    _scores = _norms = None
+
+def _norms_file(scores_file):
+    return os.path.splitext(scores_file)[0] + "_norms.npy"
+
+def _shard_pair_edges(task):
+    """
+    Worker: sub-threshold edges between row shards i and j (i <= j), read from the memory-mapped T.
+    Returns (rows, cols, n_edges) with the edges already reduced to a spanning forest.
+    """
+    (start_i, stop_i), (start_j, stop_j), threshold = task
+    A = np.asarray(_scores[start_i:stop_i])
+    B = A if start_i == start_j else np.asarray(_scores[start_j:stop_j])
+    rows, cols = block_threshold_edges(
+        A, B, np.asarray(_norms[start_i:stop_i]), np.asarray(_norms[start_j:stop_j]), threshold,
+        upper_only=start_i == start_j,
+    )
+    # Block-local indices: shard i rows first, then shard j rows (when j != i)
+    offset = 0 if B is A else len(A)
+    global_index = np.concatenate([np.arange(start_i, stop_i), np.arange(start_j, stop_j)]) if offset else np.arange(start_i, stop_i)
+    nodes, roots = _spanning_forest(rows.astype(np.int64), cols.astype(np.int64) + offset, len(global_index))
+    return global_index[nodes], global_index[roots], len(rows)
+
+def _spanning_forest(rows, cols, n):
+    """
+    Reduces a block's edges to a spanning forest of the same components (one edge
+    per merged logo, pointing at its root), so only O(shard_rows) edges leave the worker.
+    """
+    roots = compress(union_edges(np.arange(n, dtype=np.int64), rows, cols))
+    nodes = np.nonzero(roots != np.arange(n))[0]
+    return nodes, roots[nodes]
+
+def shard_bounds(N, shard_rows=SHARD_ROWS):
+    """ (start, stop) row ranges of the shards. """
+    return [(start, min(start + shard_rows, N)) for start in range(0, N, shard_rows)]
+
+def compress(parent):
+    """ Pointer jumping until every entry points at its root. Returns the root array. """
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+def union_edges(parent, rows, cols):
+    """
+    Array-based union of a batch of edges into `parent` (in place).
+    Roots are always hooked onto the smaller index (parent[x] <= x), so no cycles can form;
+    conflicting hooks in the same round are resolved by np.minimum.at and retried.
+    """
+    while len(rows):
+        roots = compress(parent)
+        parent[:] = roots
+        root_a, root_b = roots[rows], roots[cols]
+        differ = root_a != root_b
+        if not differ.any():
+            return parent
+        rows, cols = rows[differ], cols[differ]
+        hi = np.maximum(root_a[differ], root_b[differ])
+        lo = np.minimum(root_a[differ], root_b[differ])
+        np.minimum.at(parent, hi, lo)
+    return parent
+
+def _flush(parent, buffered):
+    """ Unions all buffered edge batches at once and empties the buffer. """
+    if buffered:
+        union_edges(parent, np.concatenate([r for r, _ in buffered]), np.concatenate([c for _, c in buffered]))
+        buffered.clear()
+
+def write_scores(T, scores_file):
+    """ Stores T (float32) and its row norms so workers can memory-map them instead of receiving copies. """
+    T = np.ascontiguousarray(T, dtype=np.float32)
+    np.save(scores_file, T)
+    np.save(_norms_file(scores_file), squared_norms(T))
+    return scores_file
+
+def sharded_threshold_labels(T, threshold, workers=GROUP_WORKERS, shard_rows=SHARD_ROWS):
+    """
+    Connected components of the threshold graph (Dist < ε), computed out of core:
+    T is written once to a private temporary directory (removed afterwards), every
+    (shard_i, shard_j) block pair is scanned by a worker process on the memory-mapped
+    file, and each batch of edges is merged into an array-based union-find as soon
+    as it arrives. Returns one root label per logo.
+    """
+    N = T.shape[0]
+    parent = np.arange(N, dtype=np.int64)
+    if N < 2: return parent
+
+    scores_dir = tempfile.mkdtemp(prefix="logo_scores_")
+    scores_file = os.path.join(scores_dir, "pca_scores.npy")
+    bounds = shard_bounds(N, shard_rows)
+    tasks = [(bounds[i], bounds[j], threshold) for i in range(len(bounds)) for j in range(i, len(bounds))]
+    print(f"   {len(bounds)} shards x {shard_rows} rows -> {len(tasks)} block pairs on {workers} worker(s)")
+
+    n_edges = 0
+    buffered = []
+
+    def merge(results):
+        nonlocal n_edges
+        for rows, cols, block_edges in results:
+            n_edges += block_edges
+            buffered.append((rows, cols))
+            if sum(len(r) for r, _ in buffered) >= UNION_BATCH_EDGES:
+                _flush(parent, buffered)
+        _flush(parent, buffered)
+
+    try:
+        write_scores(T, scores_file)
+        if workers <= 1:
+            _init_worker(scores_file)
+            merge(map(_shard_pair_edges, tasks))
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(workers, initializer=_init_worker, initargs=(scores_file,)) as pool:
+                merge(pool.imap_unordered(_shard_pair_edges, tasks))
+    finally:
+        _close_worker()
+        shutil.rmtree(scores_dir, ignore_errors=True)
+
+    print(f"   {n_edges} edges below ε merged.")
+    return compress(parent)
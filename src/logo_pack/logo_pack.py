@@ -0,0 +1,171 @@
+import os
+import csv
+import time
+import hashlib
+import threading
+import numpy as np
+from PIL import Image
+
+IMAGE_SIZE = (100, 100)
+INDEX_FIELDS = ["Domain", "Source_URL", "SHA1", "Row"]
+GENERATION_FILE = ".pack_generation"   # Token in the PNG folder, replaced on every saved logo
+
+def pack_paths(pack_path):
+    """ A pack is two files sharing a prefix: '<prefix>.npy' (pixels) and '<prefix>.csv' (index). """
+    return pack_path + ".npy", pack_path + ".csv"
+
+def pack_exists(pack_path):
+    return all(os.path.exists(p) for p in pack_paths(pack_path))
+
+def folder_generation(folder):
+    """ Current generation token of a PNG folder ('' if no logo was saved since tracking started). """
+    try:
+        with open(os.path.join(folder, GENERATION_FILE), encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def bump_folder_generation(folder):
+    """ Called after every saved logo: gives the folder a new generation token (one small atomic write). """
+    marker = os.path.join(folder, GENERATION_FILE)
+    tmp = f"{marker}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding='utf-8') as f:
+        f.write(f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}")
+    os.replace(tmp, marker)
+
+def _read_pack_generation(pack_path):
+    try:
+        with open(pack_path + ".generation", encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def pack_is_current(pack_path, folder):
+    """
+    True when the pack exists and was built from the folder's current generation.
+    Extraction only writes PNGs and bumps the folder's generation token on every save,
+    so comparing two tiny files is enough (no listing or stat of the PNGs).
+    A pack without its folder is taken as is.
+    """
+    if not pack_exists(pack_path): return False
+    if not folder or not os.path.isdir(folder): return True
+    return folder_generation(folder) == _read_pack_generation(pack_path)
+
+class LogoPack:
+    """
+    Packed logo container: every standardized logo is one row of a single
+    uint8 array of shape (N, 100, 100), memory-mapped so that opening the pack
+    costs two file opens and reading a logo touches only its own 10 KB.
+    The index maps Domain -> (Source_URL, SHA1, Row).
+    """
+    def __init__(self, pack_path):
+        array_path, index_path = pack_paths(pack_path)
+        self.path = pack_path
+        self.images = np.load(array_path, mmap_mode='r')
+        self.index = {}
+        with open(index_path, newline='', encoding='utf-8') as f:
+            for entry in csv.DictReader(f):
+                entry["Row"] = int(entry["Row"])
+                self.index[entry["Domain"]] = entry
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, domain):
+        return domain in self.index
+
+    def keys(self):
+        """ Domains in row order. """
+        return sorted(self.index, key=lambda d: self.index[d]["Row"])
+
+    def get(self, domain):
+        """ Random access by key: returns the 100x100 uint8 logo, or None. """
+        entry = self.index.get(domain)
+        if entry is None: return None
+        return np.asarray(self.images[entry["Row"]])
+
+    def info(self, domain):
+        return self.index.get(domain)
+
+    def matrix(self):
+        """ All logos as the (N, 10000) data matrix X used by the grouping step. """
+        return self.images.reshape(self.images.shape[0], -1)
+
+def write_pack(pack_path, domains, images, source_urls=None, generation=""):
+    """
+    Writes a pack from parallel lists of domains and 100x100 uint8 arrays.
+    Files are written under temporary names and renamed, so readers never see a half-written pack.
+    `generation` is the source folder's token the pack was built from ('<prefix>.generation').
+    """
+    array_path, index_path = pack_paths(pack_path)
+    folder = os.path.dirname(pack_path)
+    if folder and not os.path.exists(folder): os.makedirs(folder)
+
+    data = np.stack(images).astype(np.uint8) if images else np.empty((0, IMAGE_SIZE[1], IMAGE_SIZE[0]), dtype=np.uint8)
+    source_urls = source_urls or {}
+
+    with open(array_path + ".tmp", "wb") as f:
+        np.save(f, data)
+    with open(index_path + ".tmp", "w", newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writeheader()
+        for row, domain in enumerate(domains):
+            writer.writerow({
+                "Domain": domain,
+                "Source_URL": source_urls.get(domain, ""),
+                "SHA1": hashlib.sha1(data[row].tobytes()).hexdigest(),
+                "Row": row,
+            })
+
+    os.replace(array_path + ".tmp", array_path)
+    os.replace(index_path + ".tmp", index_path)
+    with open(pack_path + ".generation.tmp", "w", encoding='utf-8') as f:
+        f.write(generation)
+    os.replace(pack_path + ".generation.tmp", pack_path + ".generation")
+
+def read_source_urls(mapping_csv):
+    """ Domain -> source URL, taken from the mapper's report (URL, Image_Filename, Status). """
+    sources = {}
+    if not mapping_csv or not os.path.exists(mapping_csv): return sources
+    with open(mapping_csv, newline='', encoding='utf-8') as f:
+        for entry in csv.DictReader(f):
+            filename = entry.get("Image_Filename", "")
+            if filename and filename != "NULL":
+                sources.setdefault(os.path.splitext(filename)[0], entry.get("URL", ""))
+    return sources
+
+def pack_png_folder(folder, pack_path, mapping_csv=None):
+    """
+    Exporter PNG folder -> pack. Images are converted to grayscale and resized
+    to 100x100 exactly as the grouping loader does. Returns (packed, skipped) counts.
+    """
+    # Read before listing: a logo saved while packing leaves the pack stale instead of half-current
+    generation = folder_generation(folder)
+    domains, images, skipped = [], [], 0
+    for filename in sorted(os.listdir(folder)):
+        if not filename.lower().endswith(".png") or filename.startswith('.'):
+            continue
+        try:
+            img = Image.open(os.path.join(folder, filename))
+            if img.mode != 'L':
+                img = img.convert('RGB').convert('L')
+            if img.size != IMAGE_SIZE:
+                img = img.resize(IMAGE_SIZE, Image.Resampling.LANCZOS)
+            images.append(np.array(img))
+            domains.append(os.path.splitext(filename)[0])
+        except Exception as e:
+            print(f" Skipped {filename}: {e}")
+            skipped += 1
+
+    write_pack(pack_path, domains, images, read_source_urls(mapping_csv), generation)
+    print(f"✅ Packed {len(domains)} logos into {pack_path}.npy / .csv ({skipped} skipped)")
+    return len(domains), skipped
+
+def unpack_to_png_folder(pack_path, folder):
+    """ Exporter pack -> PNG folder ('<domain>.png' per logo). Returns the number of files written. """
+    pack = LogoPack(pack_path)
+    if not os.path.exists(folder): os.makedirs(folder)
+    for domain in pack.keys():
+        Image.fromarray(pack.get(domain)).save(os.path.join(folder, f"{domain}.png"))
+    print(f"✅ Unpacked {len(pack)} logos into {folder}")
+    return len(pack)
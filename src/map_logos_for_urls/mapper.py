@@ -3,8 +3,9 @@ import os
 from urllib.parse import urlparse
 import csv
 
-from src.extract_logo.config import INPUT_CSV, OUTPUT_LOG_CSV, OUTPUT_FOLDER
+from src.extract_logo.config import INPUT_CSV, OUTPUT_LOG_CSV, OUTPUT_FOLDER, LOGO_PACK, READ_FROM_LOGO_PACK
 from src.extract_logo.utils import get_domain_key_from_url
+from src.logo_pack.logo_pack import LogoPack, pack_exists, pack_is_current
 
 def create_final_map():
     """
@@ -21,12 +22,18 @@ def create_final_map():
         print(f"Error reading CSV '{INPUT_CSV}'. Error: {e}")
         return
 
-    # 2. Check if the output folder exists
-    if not os.path.exists(OUTPUT_FOLDER):
+    # 2. List the saved logos (packed container first, then the output folder)
+    if READ_FROM_LOGO_PACK and pack_is_current(LOGO_PACK, OUTPUT_FOLDER):
+        saved_files = [f"{domain}.png" for domain in LogoPack(LOGO_PACK).keys()]
+        print(f" Reading saved logos from pack '{LOGO_PACK}'.")
+    elif os.path.exists(OUTPUT_FOLDER):
+        if READ_FROM_LOGO_PACK and pack_exists(LOGO_PACK):
+            print(f" Pack '{LOGO_PACK}' is older than '{OUTPUT_FOLDER}', reading the folder (re-run `pack` to refresh it).")
+        saved_files = os.listdir(OUTPUT_FOLDER)
+    else:
         print(f" Output folder '{OUTPUT_FOLDER}' does not exist. Run the extraction script first.")
         return
 
-    saved_files = os.listdir(OUTPUT_FOLDER)
     mapping_results = []
     
     print(f"🚀 Starting mapping for {len(urls)} valid URLs using aggressive search...")
@@ -3,26 +3,42 @@ import concurrent.futures
 from tqdm import tqdm
 import os
 import time
+from functools import partial
 
-from main_for_test import run_pipeline_single_site 
-from src.extract_logo.config import MAX_WORKERS, OUTPUT_LOG_CSV
+from collections import Counter
+from src.extract_logo.pipeline import extract_site
+from src.extract_logo.scraper import get_logo_with_playwright_detailed
+from src.extract_logo.utils import normalize_url
+from src.extract_logo.failures import (read_failure_log, update_failure_log, next_strategy, site_outcome,
+                                       STRATEGY_FULL, STRATEGY_SKIP, FAILURE_LOG_CSV)
+from src.extract_logo.browser_pool import BrowserPool
+from src.extract_logo.config import MAX_WORKERS, OUTPUT_LOG_CSV, USE_BROWSER_POOL
 
-def re_extract_worker(url):
+def choose_strategies(urls, failure_log):
     """
-    Worker that executes the full extraction pipeline for a single failed URL.
-    Returns status for logging (RE_SUCCESS or RE_FAILED).
+    Picks the next strategy for every failed URL from its recorded failure reasons.
+    URLs without a record (e.g. older runs) get the full pipeline.
     """
+    strategies = {}
+    for url in urls:
+        key = normalize_url(str(url))
+        row = failure_log.get(key)
+        strategies[key] = next_strategy(row["Fast_Reason"], row["Browser_Reason"], row.get("Strategy_Tried")) if row else STRATEGY_FULL
+    return strategies
+
+def re_extract_worker(task, browser=get_logo_with_playwright_detailed):
+    """
+    Worker that executes the extraction pipeline for a single failed URL with the
+    chosen strategy (url, strategy). Returns the site_outcome dict.
+    """
+    url, strategy = task
     try:
-        url = str(url).strip()
-        
-        # Call the single-site pipeline (Requests -> Playwright -> PCA -> Save)
-        # This function returns True on success, False on failure.
-        status_success = run_pipeline_single_site(url) 
-        
-        return {"url": url, "status": "RE_SUCCESS" if status_success else "RE_FAILED"}
+        # Call the single-site pipeline (Requests -> Playwright -> PCA -> Save), skipping stages per strategy
+        return extract_site(url, browser=browser, strategy=strategy)
     except Exception as e:
         # Catch unexpected thread crashes
-        return {"url": url, "status": "CRASH", "error": str(e)}
+        print(f" Crash while re-extracting {url}: {e}")
+        return site_outcome(url, False, strategy=strategy)
 
 def main():
     if not os.path.exists(OUTPUT_LOG_CSV):
@@ -38,16 +54,32 @@ def main():
             print(" All logos have already been mapped. Nothing left to re-extract.")
             return
 
+        strategies = choose_strategies(failed_urls, read_failure_log())
+        plan = Counter(strategies.values())
+        tasks = [(url, strategy) for url, strategy in strategies.items() if strategy != STRATEGY_SKIP]
+
         print(f"\n Starting re-extraction for {len(failed_urls)} failed URLs...")
+        print(f" Strategies (from {FAILURE_LOG_CSV}): " + ", ".join(f"{k}={v}" for k, v in sorted(plan.items())))
+        print(f" Skipping {plan[STRATEGY_SKIP]} URLs that cannot succeed (dead domains or all strategies exhausted).")
         print(f" Using {MAX_WORKERS} concurrent browsers.")
         
     except Exception as e:
         print(f"Error reading/filtering log: {e}")
         return
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # tqdm for the visible progress bar
-        list(tqdm(executor.map(re_extract_worker, failed_urls), total=len(failed_urls), unit="site"))
+    pool = BrowserPool() if USE_BROWSER_POOL else None
+    worker = partial(re_extract_worker, browser=pool.extract_detailed) if pool else re_extract_worker
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            # tqdm for the visible progress bar
+            outcomes = list(tqdm(executor.map(worker, tasks), total=len(tasks), unit="site"))
+    finally:
+        if pool:
+            pool.close()
+            pool.report()
+
+    update_failure_log(outcomes)
+    print(f"\n Recovered: {sum(o['success'] for o in outcomes)} / {len(tasks)} attempted.")
 
     print("\nRe-extraction finalized. New logos have been saved to the 'logo_dataset_pca' folder.")
     print("\n-------------------------------------------------")